@@ -0,0 +1,137 @@
+"""
+Módulo de auditoría de acciones administrativas
+Sistema de Información PECSA
+"""
+
+import os
+import atexit
+import logging
+import queue
+import threading
+from datetime import datetime
+from psycopg2.extras import execute_values, Json
+from database import get_db_cursor
+
+logger = logging.getLogger(__name__)
+
+# Capacidad máxima de la cola en memoria (eventos pendientes de escritura)
+AUDIT_QUEUE_SIZE = int(os.getenv("AUDIT_QUEUE_SIZE", "1000"))
+
+# Eventos por INSERT multi-fila y espera máxima antes de escribir un lote
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", "200"))
+AUDIT_FLUSH_INTERVAL = float(os.getenv("AUDIT_FLUSH_INTERVAL", "1.0"))
+
+# Tiempo que una acción espera por espacio en la cola antes de escribir
+# su evento de forma síncrona (contrapresión acotada)
+AUDIT_ENQUEUE_TIMEOUT = float(os.getenv("AUDIT_ENQUEUE_TIMEOUT", "0.5"))
+
+class AuditLogWriter:
+    """
+    Escritor en segundo plano del registro de auditoría. Las acciones
+    encolan eventos sin esperar a la base de datos; un hilo los agrupa y
+    los inserta en lotes con un único INSERT multi-fila.
+    """
+
+    def __init__(self, maxsize=AUDIT_QUEUE_SIZE, batch_size=AUDIT_BATCH_SIZE,
+                 flush_interval=AUDIT_FLUSH_INTERVAL):
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.sync_writes = 0
+        self.failed_events = 0
+        self._partitions = set()
+        self._write_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="audit-log-writer", daemon=True)
+        self._thread.start()
+
+    def log(self, event):
+        """Encola un evento; si la cola está llena, lo escribe directamente"""
+        try:
+            self.queue.put(event, timeout=AUDIT_ENQUEUE_TIMEOUT)
+        except queue.Full:
+            self.sync_writes += 1
+            self._write([event])
+
+    def flush(self):
+        """Escribe de inmediato todos los eventos pendientes"""
+        batch = []
+        while True:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+            if len(batch) >= self.batch_size:
+                self._write(batch)
+                batch = []
+        if batch:
+            self._write(batch)
+
+    def _run(self):
+        """Bucle del hilo escritor"""
+        while True:
+            batch = [self.queue.get()]
+            try:
+                while len(batch) < self.batch_size:
+                    batch.append(self.queue.get(timeout=self.flush_interval))
+            except queue.Empty:
+                pass
+            self._write(batch)
+
+    def _write(self, batch):
+        """Inserta un lote de eventos en la partición mensual correspondiente"""
+        rows = [
+            (e['created_at'], e['actor_id'], e['actor_username'], e['action'],
+             e['entity_type'], e['entity_id'], Json(e['details']) if e['details'] else None)
+            for e in batch
+        ]
+        months = {row[0].strftime('%Y%m') for row in rows}
+
+        try:
+            with self._write_lock, get_db_cursor() as cursor:
+                for month in months - self._partitions:
+                    cursor.execute(
+                        "SELECT ensure_audit_log_partition(%s)",
+                        (datetime.strptime(month, '%Y%m'),)
+                    )
+                execute_values(
+                    cursor,
+                    """
+                    INSERT INTO audit_log (created_at, actor_id, actor_username, action,
+                                           entity_type, entity_id, details)
+                    VALUES %s
+                    """,
+                    rows,
+                    page_size=self.batch_size
+                )
+            self._partitions |= months
+        except Exception:
+            self.failed_events += len(batch)
+            logger.exception("No se pudieron registrar %d eventos de auditoría", len(batch))
+
+_writer = None
+_writer_lock = threading.Lock()
+
+def get_audit_writer():
+    """Retorna el escritor de auditoría del proceso (lo inicia si es necesario)"""
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = AuditLogWriter()
+                atexit.register(_writer.flush)
+    return _writer
+
+def log_action(action, entity_type=None, entity_id=None, details=None,
+               actor_id=None, actor_username=None):
+    """
+    Registra una acción administrativa en el log de auditoría (asíncrono)
+    """
+    get_audit_writer().log({
+        'created_at': datetime.now(),
+        'actor_id': actor_id,
+        'actor_username': actor_username,
+        'action': action,
+        'entity_type': entity_type,
+        'entity_id': entity_id,
+        'details': details,
+    })
@@ -3,90 +3,370 @@ Módulo de autenticación y autorización
 Sistema de Información PECSA
 """
 
-import bcrypt
+import os
+import time
+import hmac
+import hashlib
 import streamlit as st
+from dataclasses import dataclass, replace
 from datetime import datetime
 from database import execute_query
+from audit import log_action
+from session_store import get_session_store, SESSION_TTL
+from metrics import counter, histogram
+
+# Factor de trabajo de bcrypt (log2 de iteraciones). Calibrar en el servidor
+# de despliegue con: python pecsa_system/calibrate_bcrypt.py --target-ms 250
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+# Métricas (ver metrics.py)
+LOGIN_ATTEMPTS = counter("pecsa_auth_login_attempts_total", "Intentos de login", ("result",))
+BCRYPT_SECONDS = histogram("pecsa_auth_bcrypt_seconds", "Duración de las operaciones bcrypt", ("operation",))
 
 def hash_password(password):
     """
-    Genera un hash seguro para la contraseña
+    Genera un hash seguro para la contraseña con el factor de trabajo configurado
+    """
+    import bcrypt  # importación diferida: solo se necesita al crear o verificar claves
+    start = time.perf_counter()
+    salt = bcrypt.gensalt(rounds=BCRYPT_ROUNDS)
+    password_hash = bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+    BCRYPT_SECONDS.observe(time.perf_counter() - start, operation='hash')
+    return password_hash
+
+# Número mínimo de contraseñas para repartir el hashing entre hilos
+PARALLEL_HASH_THRESHOLD = 4
+
+def hash_passwords(passwords):
+    """
+    Genera los hashes de varias contraseñas, repartiendo el trabajo de bcrypt
+    en un pool de hilos (uno por núcleo) cuando el lote lo justifica. bcrypt
+    libera el GIL mientras calcula, así que los hilos corren en paralelo sin
+    hacer fork del servidor de Streamlit (multihilo)
     """
-    salt = bcrypt.gensalt()
-    return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+    passwords = list(passwords)
+    if len(passwords) < PARALLEL_HASH_THRESHOLD or (os.cpu_count() or 1) == 1:
+        return [hash_password(password) for password in passwords]
+
+    from concurrent.futures import ThreadPoolExecutor
+    workers = min(len(passwords), os.cpu_count())
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt") as pool:
+        return list(pool.map(hash_password, passwords))
 
 def verify_password(password, password_hash):
     """
     Verifica si la contraseña coincide con el hash
     """
-    return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
+    import bcrypt
+    start = time.perf_counter()
+    valid = bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
+    BCRYPT_SECONDS.observe(time.perf_counter() - start, operation='verify')
+    return valid
+
+def get_hash_rounds(password_hash):
+    """
+    Retorna el factor de trabajo de un hash bcrypt ($2b$<rounds>$...)
+    """
+    try:
+        return int(password_hash.split('$')[2])
+    except (IndexError, ValueError):
+        return None
+
+def needs_rehash(password_hash):
+    """
+    Indica si un hash fue generado con un factor distinto al configurado
+    """
+    return get_hash_rounds(password_hash) != BCRYPT_ROUNDS
 
 def authenticate_user(username, password):
     """
     Autentica un usuario y retorna sus datos si es válido
     """
+    # Roles y permisos provienen de la proyección user_effective_permissions,
+    # mantenida por triggers (ver schema.py), en lugar de agregarse en cada login;
+    # active_users usa el índice parcial idx_users_active_username
     query = """
         SELECT u.*, c.first_name, c.last_name, c.position, c.email,
-               array_agg(r.name) as roles, array_agg(r.permissions) as permissions
-        FROM users u
+               COALESCE(p.roles, '{}') as roles,
+               COALESCE(p.permissions, '{}') as permissions,
+               COALESCE(p.version, 0) as authz_version
+        FROM active_users u
         JOIN collaborators c ON u.collaborator_id = c.id
-        LEFT JOIN user_roles ur ON u.id = ur.user_id
-        LEFT JOIN roles r ON ur.role_id = r.id
-        WHERE u.username = %s AND u.is_active = true
-        GROUP BY u.id, c.first_name, c.last_name, c.position, c.email
+        LEFT JOIN user_effective_permissions p ON p.user_id = u.id
+        WHERE u.username = %s
     """
 
     user = execute_query(query, (username,), fetch_one=True)
 
     if user and verify_password(password, user['password_hash']):
-        # Actualizar último login
-        update_query = "UPDATE users SET last_login = %s WHERE id = %s"
-        execute_query(update_query, (datetime.now(), user['id']))
+        if needs_rehash(user['password_hash']):
+            # Rehash transparente al nuevo factor de trabajo, junto al último login
+            update_query = "UPDATE users SET last_login = %s, password_hash = %s WHERE id = %s"
+            execute_query(update_query, (datetime.now(), hash_password(password), user['id']))
+        else:
+            # Actualizar último login
+            update_query = "UPDATE users SET last_login = %s WHERE id = %s"
+            execute_query(update_query, (datetime.now(), user['id']))
         return user
 
     return None
 
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """
+    Usuario autenticado de la sesión. Inmutable y compacto: solo lo necesario
+    para mostrar quién es y autorizar (sin hash de contraseña ni datos del
+    colaborador, que se consultan cuando una página los necesita).
+    """
+    id: int
+    username: str
+    display_name: str
+    roles: tuple
+    permissions: frozenset
+    authz_version: int
+    previous_login: datetime = None
+
+    @property
+    def is_admin(self):
+        return 'Administrador' in self.roles
+
+    def to_payload(self):
+        """Representación JSON para el almacén compartido de sesiones"""
+        return {
+            'id': self.id,
+            'username': self.username,
+            'display_name': self.display_name,
+            'roles': list(self.roles),
+            'permissions': sorted(self.permissions),
+            'authz_version': self.authz_version,
+            'previous_login': self.previous_login.isoformat() if self.previous_login else None,
+        }
+
+    @classmethod
+    def from_payload(cls, payload):
+        """Reconstruye un Principal desde su representación JSON"""
+        previous_login = payload.get('previous_login')
+        return cls(
+            id=payload['id'],
+            username=payload['username'],
+            display_name=payload['display_name'],
+            roles=tuple(payload['roles']),
+            permissions=frozenset(payload['permissions']),
+            authz_version=payload['authz_version'],
+            previous_login=datetime.fromisoformat(previous_login) if previous_login else None
+        )
+
+def compile_permissions(permission_lists):
+    """
+    Convierte los permisos por rol ('sales_read,sales_write', ...) en un
+    conjunto de códigos individuales
+    """
+    return frozenset(
+        code.strip()
+        for permissions in permission_lists or ()
+        if permissions
+        for code in permissions.split(',')
+        if code.strip()
+    )
+
+def current_principal():
+    """
+    Retorna el Principal de la sesión actual (None si no hay sesión)
+    """
+    return st.session_state.get('principal')
+
+# ============================================
+# SESIÓN COMPARTIDA ENTRE RÉPLICAS
+# ============================================
+
+# Parámetro de la URL que transporta el token firmado de la sesión
+SESSION_TOKEN_PARAM = "sid"
+
+def _get_session_token():
+    """Lee el token de sesión de la URL"""
+    if hasattr(st, 'query_params'):
+        return st.query_params.get(SESSION_TOKEN_PARAM)
+    values = st.experimental_get_query_params().get(SESSION_TOKEN_PARAM)
+    return values[0] if values else None
+
+def _set_session_token(token):
+    """Escribe (o elimina, con None) el token de sesión en la URL"""
+    if hasattr(st, 'query_params'):
+        if token:
+            st.query_params[SESSION_TOKEN_PARAM] = token
+        else:
+            st.query_params.pop(SESSION_TOKEN_PARAM, None)
+        return
+    params = st.experimental_get_query_params()
+    params.pop(SESSION_TOKEN_PARAM, None)
+    if token:
+        params[SESSION_TOKEN_PARAM] = token
+    st.experimental_set_query_params(**params)
+
+def _client_fingerprint():
+    """
+    Huella del navegador (User-Agent e idioma) a la que se ata la sesión
+    guardada: un token copiado desde la URL, el historial o los logs no sirve
+    desde otro navegador
+    """
+    headers = None
+    if hasattr(st, 'context'):
+        headers = st.context.headers
+    else:
+        try:
+            from streamlit.web.server.websocket_headers import _get_websocket_headers
+            headers = _get_websocket_headers()
+        except ImportError:
+            pass
+    headers = headers or {}
+    client = f"{headers.get('User-Agent', '')}|{headers.get('Accept-Language', '')}"
+    return hashlib.sha256(client.encode('utf-8')).hexdigest()
+
+def _save_shared_session(store, token, principal):
+    """Guarda el Principal en el almacén y renueva la vigencia de la sesión"""
+    store.save(token, principal.id, {'principal': principal.to_payload(), 'client': _client_fingerprint()})
+    st.session_state.session_renewed_at = time.monotonic()
+
+def restore_session():
+    """
+    Recupera la sesión desde el almacén compartido cuando el navegador llega
+    con un token válido a una réplica (o a un proceso reiniciado) que no la
+    tiene en memoria. Retorna si hay una sesión activa.
+    """
+    if st.session_state.get('logged_in', False):
+        return True
+
+    store = get_session_store()
+    token = _get_session_token() if store else None
+    if not token:
+        return False
+
+    data = store.load(token)
+    if data is None or not hmac.compare_digest(data.get('client', ''), _client_fingerprint()):
+        _set_session_token(None)
+        return False
+
+    # Rotar el token: el de la URL recibida deja de ser válido, de modo que
+    # una URL copiada o registrada sirve a lo sumo una vez
+    principal = Principal.from_payload(data['principal'])
+    new_token = store.create(principal.id, {'principal': principal.to_payload(), 'client': _client_fingerprint()})
+    store.delete(token)
+    _set_session_token(new_token)
+
+    st.session_state.principal = principal
+    st.session_state.session_token = new_token
+    st.session_state.session_renewed_at = time.monotonic()
+    st.session_state.logged_in = True
+    return True
+
 def login_user(username, password):
     """
     Realiza el proceso de login y maneja la sesión
     """
     user = authenticate_user(username, password)
+    LOGIN_ATTEMPTS.inc(result='success' if user else 'failure')
     if user:
+        st.session_state.principal = Principal(
+            id=user['id'],
+            username=user['username'],
+            display_name=f"{user['first_name']} {user['last_name']}",
+            roles=tuple(user['roles'] or ()),
+            permissions=compile_permissions(user['permissions']),
+            authz_version=user['authz_version'],
+            previous_login=user['last_login']
+        )
         st.session_state.logged_in = True
-        st.session_state.user = user
-        st.session_state.username = username
-        st.session_state.user_roles = user['roles'] or []
-        st.session_state.permissions = user['permissions'] or []
+
+        store = get_session_store()
+        if store:
+            token = store.create(user['id'], {
+                'principal': st.session_state.principal.to_payload(),
+                'client': _client_fingerprint(),
+            })
+            st.session_state.session_token = token
+            st.session_state.session_renewed_at = time.monotonic()
+            _set_session_token(token)
+
+        log_action("auth.login", "user", user['id'], actor_id=user['id'], actor_username=user['username'])
         return True
     return False
 
+def refresh_session():
+    """
+    Revalida la sesión actual contra la versión de autorización del usuario.
+    Solo recarga roles y permisos cuando la versión ha cambiado; si el usuario
+    fue eliminado o desactivado, cierra la sesión. Retorna si sigue logueado.
+    """
+    principal = current_principal()
+    if not st.session_state.get('logged_in', False) or principal is None:
+        return False
+
+    # Renovar la sesión compartida mientras está en uso (vigencia deslizante)
+    store = get_session_store()
+    token = st.session_state.get('session_token')
+    if store and token and time.monotonic() - st.session_state.get('session_renewed_at', 0) > SESSION_TTL / 4:
+        _save_shared_session(store, token, principal)
+
+    # La versión se lee del primario (búsqueda por clave primaria): una réplica
+    # retrasada devolvería una versión antigua, recargaría roles obsoletos y
+    # demoraría la revocación de permisos
+    query = "SELECT version FROM user_effective_permissions WHERE user_id = %s"
+    stamp = execute_query(query, (principal.id,), fetch_one=True, readonly=True, primary=True)
+
+    if stamp and stamp['version'] == principal.authz_version:
+        return True
+
+    query = """
+        SELECT p.roles, p.permissions, p.version
+        FROM active_users u
+        JOIN user_effective_permissions p ON p.user_id = u.id
+        WHERE u.id = %s
+    """
+    authz = execute_query(query, (principal.id,), fetch_one=True, readonly=True, primary=True)
+    if not authz:
+        logout_user()
+        return False
+
+    st.session_state.principal = replace(
+        principal,
+        roles=tuple(authz['roles'] or ()),
+        permissions=compile_permissions(authz['permissions']),
+        authz_version=authz['version']
+    )
+
+    # Propagar la nueva versión al almacén para que otras réplicas no recarguen
+    if store and token:
+        _save_shared_session(store, token, st.session_state.principal)
+    return True
+
 def logout_user():
     """
-    Cierra la sesión del usuario
+    Cierra la sesión del usuario y descarta todo su estado de sesión
     """
-    keys_to_remove = ['logged_in', 'user', 'username', 'user_roles', 'permissions']
-    for key in keys_to_remove:
-        if key in st.session_state:
-            del st.session_state[key]
+    store = get_session_store()
+    token = st.session_state.get('session_token')
+    if store and token:
+        store.delete(token)
+        _set_session_token(None)
+
+    for key in list(st.session_state.keys()):
+        del st.session_state[key]
 
 def is_admin():
     """
     Verifica si el usuario actual es administrador
     """
-    return 'Administrador' in st.session_state.get('user_roles', [])
+    principal = current_principal()
+    return principal is not None and principal.is_admin
 
 def has_permission(permission):
     """
     Verifica si el usuario tiene un permiso específico
     """
-    if is_admin():
-        return True
-
-    permissions = st.session_state.get('permissions', [])
-    for perm_list in permissions:
-        if perm_list and permission in perm_list:
-            return True
-    return False
+    principal = current_principal()
+    if principal is None:
+        return False
+    return principal.is_admin or permission in principal.permissions
 
 def require_login():
     """
@@ -94,7 +374,7 @@ def require_login():
     """
     def decorator(func):
         def wrapper(*args, **kwargs):
-            if not st.session_state.get('logged_in', False):
+            if not restore_session():
                 st.warning("⚠️ Debes iniciar sesión para acceder a esta página")
                 st.stop()
             return func(*args, **kwargs)
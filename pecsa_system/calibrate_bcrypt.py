@@ -0,0 +1,65 @@
+"""
+Calibración del factor de trabajo de bcrypt
+Sistema de Información PECSA
+
+Mide en el servidor actual cuánto tarda bcrypt con cada factor de trabajo y
+recomienda el mayor cuyo tiempo no supera la latencia objetivo de login.
+
+Uso:
+    python pecsa_system/calibrate_bcrypt.py --target-ms 250
+"""
+
+import argparse
+import statistics
+import time
+import bcrypt
+
+def benchmark_rounds(rounds, samples=3):
+    """Retorna la mediana (ms) de generar un hash con el factor indicado"""
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        bcrypt.hashpw(b"calibracion-pecsa", bcrypt.gensalt(rounds=rounds))
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+def calibrate(target_ms, min_rounds=10, max_rounds=16, samples=3):
+    """
+    Recorre los factores de trabajo desde min_rounds y retorna
+    (factor recomendado, {factor: ms}). Cada factor duplica el costo, así
+    que la medición se detiene en cuanto se supera el objetivo.
+    """
+    results = {}
+    recommended = min_rounds
+    for rounds in range(min_rounds, max_rounds + 1):
+        elapsed = benchmark_rounds(rounds, samples)
+        results[rounds] = elapsed
+        if elapsed > target_ms:
+            break
+        recommended = rounds
+    return recommended, results
+
+def main():
+    parser = argparse.ArgumentParser(description="Calibra el factor de trabajo de bcrypt")
+    parser.add_argument("--target-ms", type=float, default=250,
+                        help="Latencia objetivo de un hash en milisegundos (por defecto 250)")
+    parser.add_argument("--min-rounds", type=int, default=10,
+                        help="Factor mínimo aceptable (por defecto 10)")
+    parser.add_argument("--max-rounds", type=int, default=16,
+                        help="Factor máximo a evaluar (por defecto 16)")
+    parser.add_argument("--samples", type=int, default=3,
+                        help="Mediciones por factor (por defecto 3)")
+    args = parser.parse_args()
+
+    recommended, results = calibrate(args.target_ms, args.min_rounds, args.max_rounds, args.samples)
+
+    print("Factor | Tiempo (ms)")
+    for rounds, elapsed in results.items():
+        print(f"{rounds:>6} | {elapsed:>10.1f}")
+
+    if results[args.min_rounds] > args.target_ms:
+        print(f"⚠️ Incluso el factor mínimo ({args.min_rounds}) supera {args.target_ms:.0f} ms")
+    print(f"✅ Factor recomendado: BCRYPT_ROUNDS={recommended}")
+
+if __name__ == "__main__":
+    main()
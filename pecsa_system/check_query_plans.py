@@ -0,0 +1,176 @@
+"""
+Verificación de planes de consulta de los modelos
+Sistema de Información PECSA
+
+Ejecuta las lecturas de los modelos contra una base de datos local con datos
+de prueba, obtiene el plan de cada consulta con EXPLAIN (FORMAT JSON) y lo
+compara con la línea base guardada. Falla (código de salida 1) si un plan
+introduce un Seq Scan sobre una tabla grande, si su costo estimado crece más
+de la tolerancia o si falta la línea base (del archivo o de una consulta).
+Usar solo contra una base de datos desechable.
+
+Uso:
+    python pecsa_system/check_query_plans.py --seed 50000 --update-baseline
+    python pecsa_system/check_query_plans.py --tolerance 0.2
+"""
+
+import os
+import sys
+import json
+import argparse
+from database import get_db_cursor, record_queries
+from auth import authenticate_user
+from models import (
+    CollaboratorModel, UserModel, RoleModel, UserRoleModel,
+    AuditLogModel, SearchModel, ActivityReportModel
+)
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "query_plan_baseline.json")
+
+# Consultas registradas: nombre -> llamada al modelo que las ejecuta
+PLAN_CASES = {
+    "auth.authenticate_user": lambda: authenticate_user("plan_check_missing", "-"),
+    "CollaboratorModel.get_all": lambda: CollaboratorModel.get_all(),
+    "CollaboratorModel.get_all(active)": lambda: CollaboratorModel.get_all('active'),
+    "CollaboratorModel.get_by_id": lambda: CollaboratorModel.get_by_id(1),
+    "CollaboratorModel.get_by_document": lambda: CollaboratorModel.get_by_document("PLAN-1"),
+    "UserModel.get_all": lambda: UserModel.get_all(),
+    "UserModel.get_by_id": lambda: UserModel.get_by_id(1),
+    "UserModel.get_by_username": lambda: UserModel.get_by_username("plan_user_1"),
+    "RoleModel.get_all": lambda: RoleModel.get_all(),
+    "RoleModel.get_by_name": lambda: RoleModel.get_by_name("Administrador"),
+    "UserRoleModel.get_user_roles": lambda: UserRoleModel.get_user_roles(1),
+    "UserRoleModel.get_effective_permissions": lambda: UserRoleModel.get_effective_permissions(1),
+    "AuditLogModel.get_page": lambda: AuditLogModel.get_page(action="auth.login"),
+    "SearchModel.search": lambda: SearchModel.search("plan"),
+    "ActivityReportModel.get_inactive_users": lambda: ActivityReportModel.get_inactive_users(30, 50),
+    "ActivityReportModel.get_never_logged_in": lambda: ActivityReportModel.get_never_logged_in(50),
+    "ActivityReportModel.get_logins_per_period": lambda: ActivityReportModel.get_logins_per_period('day', 30),
+}
+
+def seed_database(rows):
+    """Inserta colaboradores y usuarios sintéticos (PLAN-n / plan_user_n)"""
+    with get_db_cursor() as cursor:
+        cursor.execute("""
+            INSERT INTO collaborators (document_number, first_name, last_name, position, status)
+            SELECT 'PLAN-' || n, 'Nombre' || n, 'Apellido' || n, 'Cargo ' || (n %% 50),
+                   CASE WHEN n %% 5 = 0 THEN 'inactive' ELSE 'active' END
+            FROM generate_series(1, %s) AS n
+            ON CONFLICT DO NOTHING
+        """, (rows,))
+        cursor.execute("""
+            INSERT INTO users (username, password_hash, collaborator_id, is_active, last_login)
+            SELECT 'plan_user_' || substr(c.document_number, 6), '-', c.id, c.status = 'active',
+                   CASE WHEN c.id % 3 = 0 THEN NULL ELSE NOW() - (c.id % 365) * INTERVAL '1 day' END
+            FROM collaborators c
+            WHERE c.document_number LIKE 'PLAN-%'
+            ON CONFLICT DO NOTHING
+        """)
+        cursor.execute("""
+            INSERT INTO user_roles (user_id, role_id)
+            SELECT u.id, r.id
+            FROM users u
+            JOIN LATERAL (SELECT id FROM roles ORDER BY id OFFSET u.id % GREATEST((SELECT COUNT(*) FROM roles), 1) LIMIT 1) r ON true
+            WHERE u.username LIKE 'plan\\_user\\_%'
+            ON CONFLICT DO NOTHING
+        """)
+        cursor.execute("ANALYZE")
+
+def collect_queries():
+    """Retorna [(nombre, consulta, parámetros)] de todos los casos registrados"""
+    collected = []
+    for name, call in PLAN_CASES.items():
+        with record_queries() as recorded:
+            call()
+        for index, (query, params) in enumerate(recorded):
+            key = name if len(recorded) == 1 else f"{name}#{index + 1}"
+            collected.append((key, query, params))
+    return collected
+
+def _walk(node):
+    yield node
+    for child in node.get('Plans', ()):
+        yield from _walk(child)
+
+def explain(query, params, large_table_rows):
+    """Retorna (costo total estimado, tablas grandes con Seq Scan)"""
+    with get_db_cursor(commit=False) as cursor:
+        cursor.execute("EXPLAIN (FORMAT JSON) " + query, params)
+        plan = cursor.fetchone()['QUERY PLAN'][0]['Plan']
+
+        scanned = sorted({
+            node['Relation Name'] for node in _walk(plan)
+            if node['Node Type'] == 'Seq Scan' and 'Relation Name' in node
+        })
+        if scanned:
+            cursor.execute(
+                "SELECT relname FROM pg_class WHERE relname = ANY(%s) AND reltuples >= %s",
+                (scanned, large_table_rows)
+            )
+            scanned = sorted(row['relname'] for row in cursor.fetchall())
+    return plan['Total Cost'], scanned
+
+def check(baseline, results, tolerance):
+    """Compara los planes con la línea base y retorna la lista de fallos"""
+    failures = []
+    for key, (cost, seq_scans) in results.items():
+        expected = baseline.get(key)
+        if expected is None:
+            # Una consulta nueva sin línea base no puede aprobarse sin revisión
+            failures.append(f"{key}: sin línea base (revisar el plan y usar --update-baseline)")
+            continue
+        new_scans = [table for table in seq_scans if table not in expected['seq_scans']]
+        if new_scans:
+            failures.append(f"{key}: Seq Scan sobre {', '.join(new_scans)}")
+        if cost > expected['cost'] * (1 + tolerance):
+            failures.append(f"{key}: costo {cost:.1f} > línea base {expected['cost']:.1f}")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description="Verifica los planes de las consultas de los modelos")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="Insertar N colaboradores/usuarios sintéticos antes de verificar")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Crecimiento de costo tolerado sobre la línea base (por defecto 0.2)")
+    parser.add_argument("--large-table-rows", type=int, default=10000,
+                        help="Filas a partir de las cuales una tabla se considera grande (por defecto 10000)")
+    parser.add_argument("--baseline", default=BASELINE_PATH,
+                        help="Archivo JSON de la línea base")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="Guardar los planes actuales como nueva línea base")
+    args = parser.parse_args()
+
+    if args.seed:
+        seed_database(args.seed)
+
+    results = {
+        key: explain(query, params, args.large_table_rows)
+        for key, query, params in collect_queries()
+    }
+
+    print("Consulta | Costo | Seq Scan (tablas grandes)")
+    for key, (cost, seq_scans) in results.items():
+        print(f"{key} | {cost:.1f} | {', '.join(seq_scans) or '-'}")
+
+    if args.update_baseline:
+        baseline = {key: {'cost': cost, 'seq_scans': seq_scans} for key, (cost, seq_scans) in results.items()}
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"✅ Línea base actualizada: {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"❌ No existe la línea base {args.baseline}; genérela con --update-baseline")
+        sys.exit(1)
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+
+    failures = check(baseline, results, args.tolerance)
+    for failure in failures:
+        print(f"❌ {failure}")
+    if failures:
+        sys.exit(1)
+    print("✅ Sin regresiones en los planes de consulta")
+
+if __name__ == "__main__":
+    main()
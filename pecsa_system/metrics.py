@@ -0,0 +1,194 @@
+"""
+Módulo de métricas de la aplicación
+Sistema de Información PECSA
+
+Registro ligero de contadores, histogramas y gauges, expuesto en formato de
+texto de Prometheus por un pequeño servidor HTTP local que corre junto a
+Streamlit. Se activa con METRICS_PORT (p. ej. 9100); sin esa variable las
+métricas se siguen registrando en memoria pero no se exponen.
+"""
+
+import os
+import bisect
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+
+# Límites (segundos) de los histogramas de latencia
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class _Metric:
+    """Base de las métricas: nombre, ayuda, etiquetas y valores por etiqueta"""
+    kind = None
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, '')) for name in self.label_names)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}")
+        return lines
+
+class Counter(_Metric):
+    """Contador monótono"""
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+class Gauge(_Metric):
+    """Valor que sube y baja"""
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+class Histogram(_Metric):
+    """Distribución de observaciones en buckets acumulativos"""
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[index] += 1
+            self._values[key] = (counts, total + value)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted((key, (list(counts), total)) for key, (counts, total) in self._values.items())
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                labels = _format_labels(self.label_names, key, [('le', _format_value(float(bound)))])
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+# ============================================
+# REGISTRO
+# ============================================
+
+_registry = {}
+_registry_lock = threading.Lock()
+
+def _register(cls, name, help_text, labels=(), **kwargs):
+    """Retorna la métrica registrada con ese nombre (la crea si no existe)"""
+    with _registry_lock:
+        metric = _registry.get(name)
+        if metric is None:
+            metric = _registry[name] = cls(name, help_text, labels, **kwargs)
+        return metric
+
+def counter(name, help_text, labels=()):
+    return _register(Counter, name, help_text, labels)
+
+def gauge(name, help_text, labels=()):
+    return _register(Gauge, name, help_text, labels)
+
+def histogram(name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+    return _register(Histogram, name, help_text, labels, buckets=buckets)
+
+def render_metrics():
+    """Todas las métricas en formato de texto de Prometheus"""
+    with _registry_lock:
+        metrics = list(_registry.values())
+    lines = []
+    for metric in metrics:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+# ============================================
+# SERVIDOR HTTP
+# ============================================
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = render_metrics().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+_server = None
+_server_disabled = False
+_server_lock = threading.Lock()
+
+def start_metrics_server(port=METRICS_PORT, host=METRICS_HOST):
+    """
+    Inicia (una vez por proceso) el servidor de /metrics en un hilo aparte.
+    Retorna el servidor, o None si METRICS_PORT no está configurado o no se
+    pudo abrir (p. ej. el puerto ya está en uso por otro proceso): las
+    métricas son opcionales y nunca deben impedir que la aplicación cargue.
+    """
+    global _server, _server_disabled
+    if not port or _server_disabled:
+        return None
+    with _server_lock:
+        if _server is None and not _server_disabled:
+            try:
+                _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            except OSError:
+                _server_disabled = True
+                logger.exception("No se pudo abrir el servidor de métricas en %s:%s; métricas no expuestas",
+                                 host, port)
+                return None
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, name="metrics-server", daemon=True).start()
+    return _server
@@ -3,8 +3,8 @@ Módulo de modelos y operaciones CRUD
 Sistema de Información PECSA
 """
 
-from database import execute_query, get_db_cursor
-from auth import hash_password
+from database import execute_query, get_db_cursor, fetch_dataframe
+from auth import hash_password, hash_passwords
 from datetime import datetime
 
 # ============================================
@@ -13,27 +13,33 @@ from datetime import datetime
 
 class CollaboratorModel:
     @staticmethod
-    def get_all(status=None):
-        """Obtiene todos los colaboradores"""
-        query = "SELECT * FROM collaborators"
+    def get_all(status=None, as_frame=False):
+        """Obtiene todos los colaboradores (como DataFrame si as_frame=True)"""
         params = []
-        if status:
-            query += " WHERE status = %s"
+        if status == 'active':
+            # Vista sobre el índice parcial idx_collaborators_active_name
+            query = "SELECT * FROM active_collaborators"
+        elif status:
+            query = "SELECT * FROM collaborators WHERE status = %s"
             params.append(status)
+        else:
+            query = "SELECT * FROM collaborators"
         query += " ORDER BY last_name, first_name"
-        return execute_query(query, params if params else None, fetch_all=True)
+        if as_frame:
+            return fetch_dataframe(query, params if params else None)
+        return execute_query(query, params if params else None, fetch_all=True, readonly=True)
 
     @staticmethod
     def get_by_id(collaborator_id):
         """Obtiene un colaborador por ID"""
         query = "SELECT * FROM collaborators WHERE id = %s"
-        return execute_query(query, (collaborator_id,), fetch_one=True)
+        return execute_query(query, (collaborator_id,), fetch_one=True, readonly=True)
 
     @staticmethod
     def get_by_document(document_number):
         """Obtiene un colaborador por número de documento"""
         query = "SELECT * FROM collaborators WHERE document_number = %s"
-        return execute_query(query, (document_number,), fetch_one=True)
+        return execute_query(query, (document_number,), fetch_one=True, readonly=True)
 
     @staticmethod
     def create(data):
@@ -68,12 +74,19 @@ class CollaboratorModel:
         execute_query(query, params)
         return True
 
+    @staticmethod
+    def set_status(collaborator_ids, status):
+        """Cambia el estado de uno o varios colaboradores en una sola sentencia"""
+        if isinstance(collaborator_ids, int):
+            collaborator_ids = [collaborator_ids]
+        query = "UPDATE collaborators SET status = %s, updated_at = %s WHERE id = ANY(%s)"
+        execute_query(query, (status, datetime.now(), list(collaborator_ids)))
+        return True
+
     @staticmethod
     def delete(collaborator_id):
         """Elimina un colaborador (cambio de estado)"""
-        query = "UPDATE collaborators SET status = 'inactive', updated_at = %s WHERE id = %s"
-        execute_query(query, (datetime.now(), collaborator_id))
-        return True
+        return CollaboratorModel.set_status(collaborator_id, 'inactive')
 
 # ============================================
 # MODELO: Usuarios
@@ -81,11 +94,11 @@ class CollaboratorModel:
 
 class UserModel:
     @staticmethod
-    def get_all():
+    def get_all(as_frame=False):
         """Obtiene todos los usuarios con información del colaborador"""
         query = """
             SELECT u.*, c.first_name, c.last_name, c.document_number, c.position,
-                   array_agg(r.name) as roles
+                   array_remove(array_agg(r.name ORDER BY r.name), NULL) as roles
             FROM users u
             JOIN collaborators c ON u.collaborator_id = c.id
             LEFT JOIN user_roles ur ON u.id = ur.user_id
@@ -93,7 +106,9 @@ class UserModel:
             GROUP BY u.id, c.first_name, c.last_name, c.document_number, c.position
             ORDER BY c.last_name, c.first_name
         """
-        return execute_query(query, fetch_all=True)
+        if as_frame:
+            return fetch_dataframe(query)
+        return execute_query(query, fetch_all=True, readonly=True)
 
     @staticmethod
     def get_by_id(user_id):
@@ -104,13 +119,13 @@ class UserModel:
             JOIN collaborators c ON u.collaborator_id = c.id
             WHERE u.id = %s
         """
-        return execute_query(query, (user_id,), fetch_one=True)
+        return execute_query(query, (user_id,), fetch_one=True, readonly=True)
 
     @staticmethod
     def get_by_username(username):
         """Obtiene un usuario por nombre de usuario"""
         query = "SELECT * FROM users WHERE username = %s"
-        return execute_query(query, (username,), fetch_one=True)
+        return execute_query(query, (username,), fetch_one=True, readonly=True)
 
     @staticmethod
     def create(data):
@@ -127,6 +142,55 @@ class UserModel:
         )
         return execute_query(query, params, fetch_one=True)
 
+    @staticmethod
+    def bulk_create(entries, role_ids=None):
+        """
+        Crea varios usuarios (y sus roles iniciales) en una sola transacción.
+        entries es una lista de dicts con username, password, collaborator_id
+        e is_active. Los usuarios que chocan con uno existente (username o
+        colaborador ya usado) se omiten sin abortar el lote.
+        Retorna (creados, conflictos): filas {id, username} y usernames omitidos.
+        """
+        # Descartar usernames repetidos dentro del mismo lote
+        unique_entries = {}
+        conflicts = []
+        for entry in entries:
+            if entry['username'] in unique_entries:
+                conflicts.append(entry['username'])
+            else:
+                unique_entries[entry['username']] = entry
+        entries = list(unique_entries.values())
+        if not entries:
+            return [], conflicts
+
+        password_hashes = hash_passwords(e['password'] for e in entries)
+
+        with get_db_cursor() as cursor:
+            cursor.execute("""
+                INSERT INTO users (username, password_hash, collaborator_id, is_active)
+                SELECT * FROM unnest(%s::varchar[], %s::varchar[], %s::int[], %s::boolean[])
+                ON CONFLICT DO NOTHING
+                RETURNING id, username
+            """, (
+                [e['username'] for e in entries], password_hashes,
+                [e['collaborator_id'] for e in entries],
+                [e.get('is_active', True) for e in entries]
+            ))
+            created = cursor.fetchall()
+
+            if role_ids and created:
+                cursor.execute("""
+                    INSERT INTO user_roles (user_id, role_id)
+                    SELECT u.id, r.id
+                    FROM unnest(%s::int[]) AS u(id)
+                    CROSS JOIN unnest(%s::int[]) AS r(id)
+                    ON CONFLICT (user_id, role_id) DO NOTHING
+                """, ([c['id'] for c in created], list(role_ids)))
+
+        created_usernames = {c['username'] for c in created}
+        conflicts.extend(e['username'] for e in entries if e['username'] not in created_usernames)
+        return created, conflicts
+
     @staticmethod
     def update(user_id, data):
         """Actualiza un usuario"""
@@ -162,12 +226,19 @@ class UserModel:
         execute_query(query, (user_id,))
         return True
 
+    @staticmethod
+    def set_active(user_ids, is_active):
+        """Activa o desactiva uno o varios usuarios en una sola sentencia"""
+        if isinstance(user_ids, int):
+            user_ids = [user_ids]
+        query = "UPDATE users SET is_active = %s, updated_at = %s WHERE id = ANY(%s)"
+        execute_query(query, (is_active, datetime.now(), list(user_ids)))
+        return True
+
     @staticmethod
     def deactivate(user_id):
         """Desactiva un usuario"""
-        query = "UPDATE users SET is_active = false, updated_at = %s WHERE id = %s"
-        execute_query(query, (datetime.now(), user_id))
-        return True
+        return UserModel.set_active(user_id, False)
 
 # ============================================
 # MODELO: Roles
@@ -175,8 +246,8 @@ class UserModel:
 
 class RoleModel:
     @staticmethod
-    def get_all():
-        """Obtiene todos los roles"""
+    def get_all(as_frame=False):
+        """Obtiene todos los roles (como DataFrame si as_frame=True)"""
         query = """
             SELECT r.*, COUNT(ur.user_id) as user_count
             FROM roles r
@@ -184,19 +255,21 @@ class RoleModel:
             GROUP BY r.id
             ORDER BY r.name
         """
-        return execute_query(query, fetch_all=True)
+        if as_frame:
+            return fetch_dataframe(query)
+        return execute_query(query, fetch_all=True, readonly=True)
 
     @staticmethod
     def get_by_id(role_id):
         """Obtiene un rol por ID"""
         query = "SELECT * FROM roles WHERE id = %s"
-        return execute_query(query, (role_id,), fetch_one=True)
+        return execute_query(query, (role_id,), fetch_one=True, readonly=True)
 
     @staticmethod
     def get_by_name(name):
         """Obtiene un rol por nombre"""
         query = "SELECT * FROM roles WHERE name = %s"
-        return execute_query(query, (name,), fetch_one=True)
+        return execute_query(query, (name,), fetch_one=True, readonly=True)
 
     @staticmethod
     def create(data):
@@ -248,7 +321,17 @@ class UserRoleModel:
             WHERE ur.user_id = %s
             ORDER BY r.name
         """
-        return execute_query(query, (user_id,), fetch_all=True)
+        return execute_query(query, (user_id,), fetch_all=True, readonly=True)
+
+    @staticmethod
+    def get_effective_permissions(user_id):
+        """Obtiene los roles y permisos efectivos de un usuario (proyección)"""
+        query = """
+            SELECT user_id, roles, permissions, refreshed_at
+            FROM user_effective_permissions
+            WHERE user_id = %s
+        """
+        return execute_query(query, (user_id,), fetch_one=True, readonly=True)
 
     @staticmethod
     def assign_role(user_id, role_id):
@@ -282,3 +365,115 @@ class UserRoleModel:
                     (user_id, role_id)
                 )
         return True
+
+# ============================================
+# MODELO: Auditoría
+# ============================================
+
+class AuditLogModel:
+    @staticmethod
+    def get_page(before=None, action=None, limit=50):
+        """
+        Obtiene una página del log de auditoría (más recientes primero).
+        before es el par (created_at, id) del último evento de la página
+        anterior; la paginación por clave usa idx_audit_log_created.
+        """
+        query = "SELECT * FROM audit_log"
+        conditions = []
+        params = []
+        if before:
+            conditions.append("(created_at, id) < (%s, %s)")
+            params.extend(before)
+        if action:
+            conditions.append("action = %s")
+            params.append(action)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY created_at DESC, id DESC LIMIT %s"
+        params.append(limit)
+        return execute_query(query, params, fetch_all=True, readonly=True)
+
+# ============================================
+# MODELO: Búsqueda global
+# ============================================
+
+class SearchModel:
+    @staticmethod
+    def search(term, limit=10):
+        """
+        Busca colaboradores, usuarios y roles en el índice trigram.
+        Primero las coincidencias por prefijo, luego por similitud.
+        """
+        term = term.strip().lower()
+        escaped = term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        query = """
+            SELECT entity_type, entity_id, label,
+                   similarity(search_text, %(term)s) as score
+            FROM search_index
+            WHERE search_text LIKE %(contains)s OR search_text %% %(term)s
+            ORDER BY search_text LIKE %(prefix)s DESC, score DESC, label
+            LIMIT %(limit)s
+        """
+        params = {
+            'term': term,
+            'contains': f"%{escaped}%",
+            'prefix': f"{escaped}%",
+            'limit': limit
+        }
+        return execute_query(query, params, fetch_all=True, readonly=True)
+
+# ============================================
+# MODELO: Reportes de actividad
+# ============================================
+
+class ActivityReportModel:
+    @staticmethod
+    def get_inactive_users(days, limit=None, offset=0):
+        """
+        Obtiene los usuarios cuyo último acceso fue hace más de N días
+        (más antiguos primero). Cada fila incluye total_count para paginar.
+        """
+        query = """
+            SELECT u.id, u.username, c.first_name, c.last_name, u.is_active, u.last_login,
+                   COUNT(*) OVER () as total_count
+            FROM users u
+            JOIN collaborators c ON u.collaborator_id = c.id
+            WHERE u.last_login < NOW() - make_interval(days => %s)
+            ORDER BY u.last_login, u.id
+            LIMIT %s OFFSET %s
+        """
+        return execute_query(query, (days, limit, offset), fetch_all=True, readonly=True)
+
+    @staticmethod
+    def get_never_logged_in(limit=None, offset=0):
+        """Obtiene los usuarios que nunca han iniciado sesión"""
+        query = """
+            SELECT u.id, u.username, c.first_name, c.last_name, u.is_active,
+                   COUNT(*) OVER () as total_count
+            FROM users u
+            JOIN collaborators c ON u.collaborator_id = c.id
+            WHERE u.last_login IS NULL
+            ORDER BY u.id
+            LIMIT %s OFFSET %s
+        """
+        return execute_query(query, (limit, offset), fetch_all=True, readonly=True)
+
+    @staticmethod
+    def get_logins_per_period(period='day', days=30):
+        """
+        Cuenta los inicios de sesión por día o semana en los últimos N días,
+        a partir de los eventos auth.login del log de auditoría
+        """
+        if period not in ('day', 'week'):
+            raise ValueError(f"Periodo no soportado: {period}")
+        query = """
+            SELECT date_trunc(%s, created_at) as period,
+                   COUNT(*) as logins,
+                   COUNT(DISTINCT actor_id) as users
+            FROM audit_log
+            WHERE action = 'auth.login'
+              AND created_at >= NOW() - make_interval(days => %s)
+            GROUP BY 1
+            ORDER BY 1 DESC
+        """
+        return execute_query(query, (period, days), fetch_all=True, readonly=True)
@@ -0,0 +1,408 @@
+"""
+Módulo de esquema y objetos auxiliares de base de datos
+Sistema de Información PECSA
+"""
+
+import logging
+import threading
+from database import get_db_cursor, execute_query
+
+logger = logging.getLogger(__name__)
+
+# ============================================
+# PROYECCIÓN: Permisos efectivos por usuario
+# ============================================
+
+# Tabla desnormalizada con los roles y permisos de cada usuario. Se mantiene
+# sincronizada mediante triggers sobre users, user_roles y roles, de modo que
+# el login y la recarga de permisos sean una búsqueda por clave primaria.
+# La columna version se incrementa en cada cambio y permite a las sesiones
+# abiertas detectar, con una sola lectura, que sus permisos quedaron obsoletos.
+EFFECTIVE_PERMISSIONS_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS user_effective_permissions (
+        user_id INTEGER PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+        roles TEXT[] NOT NULL DEFAULT '{}',
+        permissions TEXT[] NOT NULL DEFAULT '{}',
+        version BIGINT NOT NULL DEFAULT 1,
+        refreshed_at TIMESTAMP NOT NULL DEFAULT NOW()
+    );
+
+    ALTER TABLE user_effective_permissions
+        ADD COLUMN IF NOT EXISTS version BIGINT NOT NULL DEFAULT 1;
+
+    CREATE OR REPLACE FUNCTION refresh_user_effective_permissions(p_user_id INTEGER)
+    RETURNS VOID AS $$
+    BEGIN
+        INSERT INTO user_effective_permissions (user_id, roles, permissions, refreshed_at)
+        SELECT u.id,
+               COALESCE(array_agg(r.name ORDER BY r.name)
+                        FILTER (WHERE r.id IS NOT NULL), '{}'),
+               COALESCE(array_agg(r.permissions ORDER BY r.name)
+                        FILTER (WHERE r.permissions IS NOT NULL), '{}'),
+               NOW()
+        FROM users u
+        LEFT JOIN user_roles ur ON u.id = ur.user_id
+        LEFT JOIN roles r ON ur.role_id = r.id
+        WHERE u.id = p_user_id
+        GROUP BY u.id
+        ON CONFLICT (user_id) DO UPDATE
+        SET roles = EXCLUDED.roles,
+            permissions = EXCLUDED.permissions,
+            version = user_effective_permissions.version + 1,
+            refreshed_at = EXCLUDED.refreshed_at;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    CREATE OR REPLACE FUNCTION trg_users_effective_permissions()
+    RETURNS TRIGGER AS $$
+    BEGIN
+        PERFORM refresh_user_effective_permissions(NEW.id);
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    CREATE OR REPLACE FUNCTION trg_user_roles_effective_permissions()
+    RETURNS TRIGGER AS $$
+    BEGIN
+        IF TG_OP <> 'INSERT' THEN
+            PERFORM refresh_user_effective_permissions(OLD.user_id);
+        END IF;
+        IF TG_OP <> 'DELETE' THEN
+            PERFORM refresh_user_effective_permissions(NEW.user_id);
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    CREATE OR REPLACE FUNCTION trg_roles_effective_permissions()
+    RETURNS TRIGGER AS $$
+    BEGIN
+        PERFORM refresh_user_effective_permissions(ur.user_id)
+        FROM user_roles ur
+        WHERE ur.role_id = NEW.id;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    DROP TRIGGER IF EXISTS users_effective_permissions ON users;
+    CREATE TRIGGER users_effective_permissions
+        AFTER INSERT OR UPDATE OF username, is_active ON users
+        FOR EACH ROW EXECUTE FUNCTION trg_users_effective_permissions();
+
+    DROP TRIGGER IF EXISTS user_roles_effective_permissions ON user_roles;
+    CREATE TRIGGER user_roles_effective_permissions
+        AFTER INSERT OR UPDATE OR DELETE ON user_roles
+        FOR EACH ROW EXECUTE FUNCTION trg_user_roles_effective_permissions();
+
+    DROP TRIGGER IF EXISTS roles_effective_permissions ON roles;
+    CREATE TRIGGER roles_effective_permissions
+        AFTER UPDATE OF name, permissions ON roles
+        FOR EACH ROW EXECUTE FUNCTION trg_roles_effective_permissions();
+
+    -- Carga inicial de la proyección para los usuarios existentes
+    SELECT refresh_user_effective_permissions(id) FROM users;
+"""
+
+# ============================================
+# AUDITORÍA: Log de acciones administrativas
+# ============================================
+
+# Tabla de solo inserción particionada por mes. Las particiones se crean bajo
+# demanda con ensure_audit_log_partition (ver audit.py).
+AUDIT_LOG_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS audit_log (
+        id BIGSERIAL,
+        created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+        actor_id INTEGER,
+        actor_username VARCHAR(50),
+        action VARCHAR(50) NOT NULL,
+        entity_type VARCHAR(30),
+        entity_id INTEGER,
+        details JSONB,
+        PRIMARY KEY (id, created_at)
+    ) PARTITION BY RANGE (created_at);
+
+    CREATE INDEX IF NOT EXISTS idx_audit_log_created ON audit_log (created_at DESC, id DESC);
+    CREATE INDEX IF NOT EXISTS idx_audit_log_action ON audit_log (action, created_at DESC);
+    CREATE INDEX IF NOT EXISTS idx_audit_log_actor ON audit_log (actor_id, created_at DESC);
+
+    CREATE OR REPLACE FUNCTION ensure_audit_log_partition(p_ts TIMESTAMP)
+    RETURNS VOID AS $$
+    DECLARE
+        v_start DATE := date_trunc('month', p_ts)::date;
+        v_end DATE := (date_trunc('month', p_ts) + INTERVAL '1 month')::date;
+    BEGIN
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS %I PARTITION OF audit_log FOR VALUES FROM (%L) TO (%L)',
+            'audit_log_' || to_char(v_start, 'YYYYMM'), v_start, v_end
+        );
+    END;
+    $$ LANGUAGE plpgsql;
+
+    SELECT ensure_audit_log_partition(NOW()::timestamp);
+    SELECT ensure_audit_log_partition((NOW() + INTERVAL '1 month')::timestamp);
+"""
+
+# ============================================
+# BÚSQUEDA GLOBAL: Índice trigram
+# ============================================
+
+# Una fila por colaborador, usuario y rol, mantenida por triggers. Un único
+# índice GIN trigram sobre search_text resuelve la búsqueda global.
+SEARCH_INDEX_SCHEMA = """
+    CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+    CREATE TABLE IF NOT EXISTS search_index (
+        entity_type VARCHAR(20) NOT NULL,
+        entity_id INTEGER NOT NULL,
+        label TEXT NOT NULL,
+        search_text TEXT NOT NULL,
+        PRIMARY KEY (entity_type, entity_id)
+    );
+
+    CREATE INDEX IF NOT EXISTS idx_search_index_trgm
+        ON search_index USING GIN (search_text gin_trgm_ops);
+
+    CREATE OR REPLACE FUNCTION search_index_refresh_user(p_user_id INTEGER)
+    RETURNS VOID AS $$
+        INSERT INTO search_index (entity_type, entity_id, label, search_text)
+        SELECT 'user', u.id,
+               u.username || ' - ' || c.first_name || ' ' || c.last_name,
+               lower(concat_ws(' ', u.username, c.first_name, c.last_name))
+        FROM users u
+        JOIN collaborators c ON u.collaborator_id = c.id
+        WHERE u.id = p_user_id
+        ON CONFLICT (entity_type, entity_id) DO UPDATE
+        SET label = EXCLUDED.label, search_text = EXCLUDED.search_text;
+    $$ LANGUAGE sql;
+
+    CREATE OR REPLACE FUNCTION trg_collaborators_search_index()
+    RETURNS TRIGGER AS $$
+    BEGIN
+        IF TG_OP = 'DELETE' THEN
+            DELETE FROM search_index WHERE entity_type = 'collaborator' AND entity_id = OLD.id;
+            RETURN NULL;
+        END IF;
+
+        INSERT INTO search_index (entity_type, entity_id, label, search_text)
+        VALUES ('collaborator', NEW.id,
+                NEW.first_name || ' ' || NEW.last_name || ' (' || NEW.document_number || ')',
+                lower(concat_ws(' ', NEW.first_name, NEW.last_name, NEW.document_number)))
+        ON CONFLICT (entity_type, entity_id) DO UPDATE
+        SET label = EXCLUDED.label, search_text = EXCLUDED.search_text;
+
+        -- La etiqueta de los usuarios incluye el nombre del colaborador
+        IF TG_OP = 'UPDATE' THEN
+            PERFORM search_index_refresh_user(u.id) FROM users u WHERE u.collaborator_id = NEW.id;
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    CREATE OR REPLACE FUNCTION trg_users_search_index()
+    RETURNS TRIGGER AS $$
+    BEGIN
+        IF TG_OP = 'DELETE' THEN
+            DELETE FROM search_index WHERE entity_type = 'user' AND entity_id = OLD.id;
+        ELSE
+            PERFORM search_index_refresh_user(NEW.id);
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    CREATE OR REPLACE FUNCTION trg_roles_search_index()
+    RETURNS TRIGGER AS $$
+    BEGIN
+        IF TG_OP = 'DELETE' THEN
+            DELETE FROM search_index WHERE entity_type = 'role' AND entity_id = OLD.id;
+        ELSE
+            INSERT INTO search_index (entity_type, entity_id, label, search_text)
+            VALUES ('role', NEW.id, NEW.name, lower(NEW.name))
+            ON CONFLICT (entity_type, entity_id) DO UPDATE
+            SET label = EXCLUDED.label, search_text = EXCLUDED.search_text;
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    DROP TRIGGER IF EXISTS collaborators_search_index ON collaborators;
+    CREATE TRIGGER collaborators_search_index
+        AFTER INSERT OR UPDATE OF first_name, last_name, document_number OR DELETE ON collaborators
+        FOR EACH ROW EXECUTE FUNCTION trg_collaborators_search_index();
+
+    DROP TRIGGER IF EXISTS users_search_index ON users;
+    CREATE TRIGGER users_search_index
+        AFTER INSERT OR UPDATE OF username, collaborator_id OR DELETE ON users
+        FOR EACH ROW EXECUTE FUNCTION trg_users_search_index();
+
+    DROP TRIGGER IF EXISTS roles_search_index ON roles;
+    CREATE TRIGGER roles_search_index
+        AFTER INSERT OR UPDATE OF name OR DELETE ON roles
+        FOR EACH ROW EXECUTE FUNCTION trg_roles_search_index();
+
+    -- Carga inicial del índice
+    INSERT INTO search_index (entity_type, entity_id, label, search_text)
+    SELECT 'collaborator', c.id,
+           c.first_name || ' ' || c.last_name || ' (' || c.document_number || ')',
+           lower(concat_ws(' ', c.first_name, c.last_name, c.document_number))
+    FROM collaborators c
+    ON CONFLICT (entity_type, entity_id) DO UPDATE
+    SET label = EXCLUDED.label, search_text = EXCLUDED.search_text;
+
+    SELECT search_index_refresh_user(id) FROM users;
+
+    INSERT INTO search_index (entity_type, entity_id, label, search_text)
+    SELECT 'role', r.id, r.name, lower(r.name)
+    FROM roles r
+    ON CONFLICT (entity_type, entity_id) DO UPDATE
+    SET label = EXCLUDED.label, search_text = EXCLUDED.search_text;
+"""
+
+# ============================================
+# REPORTES DE ACTIVIDAD
+# ============================================
+
+# Índice para los reportes de usuarios inactivos / sin acceso (ver
+# ActivityReportModel); el conteo de ingresos usa idx_audit_log_action
+ACTIVITY_SCHEMA = """
+    CREATE INDEX IF NOT EXISTS idx_users_last_login ON users (last_login);
+"""
+
+# ============================================
+# SESIONES COMPARTIDAS
+# ============================================
+
+# Almacén de sesiones para SESSION_STORE=postgres (ver session_store.py);
+# session_key es el hash del identificador del token, nunca el token
+SESSION_STORE_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS app_sessions (
+        session_key CHAR(64) PRIMARY KEY,
+        user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+        data JSONB NOT NULL,
+        created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+        expires_at TIMESTAMP NOT NULL
+    );
+
+    CREATE INDEX IF NOT EXISTS idx_app_sessions_expires ON app_sessions (expires_at);
+"""
+
+# ============================================
+# FILAS ACTIVAS Y ARCHIVO
+# ============================================
+
+# Las bajas son lógicas (status / is_active), así que las tablas acumulan filas
+# inactivas. Los índices parciales cubren solo las filas activas y las vistas
+# active_* permiten a las lecturas frecuentes usarlos (ver models.py y auth.py).
+# archive_inactive_rows(días) mueve opcionalmente a tablas *_archive las filas
+# inactivas sin cambios en ese periodo.
+ACTIVE_ROWS_SCHEMA = """
+    CREATE INDEX IF NOT EXISTS idx_collaborators_active_name
+        ON collaborators (last_name, first_name) WHERE status = 'active';
+    CREATE INDEX IF NOT EXISTS idx_users_active_username
+        ON users (username) WHERE is_active;
+
+    CREATE OR REPLACE VIEW active_collaborators AS
+        SELECT * FROM collaborators WHERE status = 'active';
+    CREATE OR REPLACE VIEW active_users AS
+        SELECT * FROM users WHERE is_active;
+
+    CREATE TABLE IF NOT EXISTS collaborators_archive (LIKE collaborators INCLUDING DEFAULTS);
+    ALTER TABLE collaborators_archive ADD COLUMN IF NOT EXISTS archived_at TIMESTAMP NOT NULL DEFAULT NOW();
+    CREATE TABLE IF NOT EXISTS users_archive (LIKE users INCLUDING DEFAULTS);
+    ALTER TABLE users_archive ADD COLUMN IF NOT EXISTS archived_at TIMESTAMP NOT NULL DEFAULT NOW();
+
+    CREATE OR REPLACE FUNCTION archive_inactive_rows(p_days INTEGER)
+    RETURNS TABLE (archived_users INTEGER, archived_collaborators INTEGER) AS $$
+    DECLARE
+        v_cutoff TIMESTAMP := NOW() - make_interval(days => p_days);
+    BEGIN
+        DELETE FROM user_roles ur
+        USING users u
+        WHERE ur.user_id = u.id AND NOT u.is_active AND u.updated_at < v_cutoff;
+
+        WITH moved AS (
+            DELETE FROM users
+            WHERE NOT is_active AND updated_at < v_cutoff
+            RETURNING *
+        )
+        INSERT INTO users_archive SELECT moved.*, NOW() FROM moved;
+        GET DIAGNOSTICS archived_users = ROW_COUNT;
+
+        -- Solo colaboradores sin usuario (los usuarios archivados ya no cuentan)
+        WITH moved AS (
+            DELETE FROM collaborators c
+            WHERE c.status = 'inactive' AND c.updated_at < v_cutoff
+              AND NOT EXISTS (SELECT 1 FROM users u WHERE u.collaborator_id = c.id)
+            RETURNING c.*
+        )
+        INSERT INTO collaborators_archive SELECT moved.*, NOW() FROM moved;
+        GET DIAGNOSTICS archived_collaborators = ROW_COUNT;
+
+        RETURN NEXT;
+    END;
+    $$ LANGUAGE plpgsql;
+"""
+
+# Scripts en el orden en que deben aplicarse (todos son idempotentes)
+SCHEMA_SCRIPTS = [
+    EFFECTIVE_PERMISSIONS_SCHEMA,
+    AUDIT_LOG_SCHEMA,
+    SEARCH_INDEX_SCHEMA,
+    ACTIVITY_SCHEMA,
+    SESSION_STORE_SCHEMA,
+    ACTIVE_ROWS_SCHEMA,
+]
+
+# Clave del advisory lock que serializa aplicaciones concurrentes del esquema
+# (varias réplicas arrancando a la vez)
+SCHEMA_LOCK_KEY = 7302641
+
+# Relaciones que el login y la recarga de sesión necesitan: si alguna falta,
+# el esquema no se ha aplicado en esta base de datos
+REQUIRED_RELATIONS = (
+    'user_effective_permissions', 'audit_log', 'search_index',
+    'app_sessions', 'active_collaborators', 'active_users',
+)
+
+_schema_ready = False
+_schema_lock = threading.Lock()
+
+def apply_schema():
+    """
+    Aplica los objetos auxiliares del esquema (tablas, funciones y triggers)
+    """
+    with get_db_cursor() as cursor:
+        cursor.execute("SELECT pg_advisory_xact_lock(%s)", (SCHEMA_LOCK_KEY,))
+        for script in SCHEMA_SCRIPTS:
+            cursor.execute(script)
+    return True
+
+def schema_missing():
+    """Retorna las relaciones requeridas que no existen en la base de datos"""
+    rows = execute_query(
+        "SELECT name FROM unnest(%s::text[]) AS name WHERE to_regclass(name) IS NULL",
+        (list(REQUIRED_RELATIONS),), fetch_all=True
+    )
+    return [row['name'] for row in rows]
+
+def ensure_schema():
+    """
+    Verifica una vez por proceso que el esquema esté aplicado y lo aplica si
+    falta (p. ej. primer arranque sin el paso de release). Si la base de datos
+    no está disponible la verificación se reintenta en la siguiente llamada.
+    """
+    global _schema_ready
+    if _schema_ready:
+        return
+    with _schema_lock:
+        if not _schema_ready:
+            missing = schema_missing()
+            if missing:
+                logger.warning("Faltan objetos del esquema (%s); aplicando esquema", ', '.join(missing))
+                apply_schema()
+            _schema_ready = True
+
+if __name__ == "__main__":
+    apply_schema()
+    print("✅ Esquema aplicado correctamente")
@@ -0,0 +1,94 @@
+"""
+Módulo de contabilidad y limpieza del estado de sesión
+Sistema de Información PECSA
+"""
+
+import sys
+import time
+import threading
+
+# Tiempo (segundos) tras el cual una sesión sin reruns deja de contabilizarse
+SESSION_SIZE_TTL = 3600
+
+# Reruns entre dos mediciones del estado de una misma sesión: recorrer todo el
+# estado en cada rerun cuesta más que la información que aporta
+SESSION_SIZE_SAMPLE_EVERY = 20
+
+_session_sizes = {}
+_lock = threading.Lock()
+
+def estimate_size(value, _seen=None):
+    """
+    Estima la memoria (bytes) de un valor incluyendo su contenido. Los
+    DataFrames / Series se miden sin inspeccionar cada texto (deep=False): las
+    columnas de objetos cuentan solo sus referencias, a cambio de no recorrer
+    cada celda en cada medición
+    """
+    seen = _seen if _seen is not None else set()
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+
+    # DataFrames / Series de pandas
+    if hasattr(value, 'memory_usage') and hasattr(value, 'index'):
+        usage = value.memory_usage(deep=False)
+        return int(usage.sum() if hasattr(usage, 'sum') else usage)
+
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(estimate_size(k, seen) + estimate_size(v, seen) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(estimate_size(item, seen) for item in value)
+    elif hasattr(value, '__slots__'):
+        size += sum(estimate_size(getattr(value, slot, None), seen) for slot in value.__slots__)
+    elif hasattr(value, '__dict__'):
+        size += estimate_size(vars(value), seen)
+    return size
+
+def record_session_size(session_key, state):
+    """
+    Registra el tamaño estimado del estado de una sesión y lo retorna. El
+    estado se mide en el primer rerun de la sesión y luego una vez cada
+    SESSION_SIZE_SAMPLE_EVERY reruns; entre mediciones se retorna la última
+    """
+    now = time.monotonic()
+    with _lock:
+        previous = _session_sizes.get(session_key)
+        if previous is not None and previous[3] < SESSION_SIZE_SAMPLE_EVERY:
+            size, keys, _, reruns = previous
+            _session_sizes[session_key] = (size, keys, now, reruns + 1)
+            return size
+
+    size = estimate_size(state)
+    with _lock:
+        _session_sizes[session_key] = (size, len(state), now, 1)
+        # Descartar sesiones sin actividad reciente
+        for key, (_, _, seen_at, _) in list(_session_sizes.items()):
+            if now - seen_at > SESSION_SIZE_TTL:
+                del _session_sizes[key]
+    return size
+
+def session_size_summary():
+    """
+    Retorna (sesiones activas, bytes totales, bytes de la sesión más grande)
+    """
+    with _lock:
+        sizes = [size for size, _, _, _ in _session_sizes.values()]
+    return len(sizes), sum(sizes), max(sizes, default=0)
+
+def cleanup_page_state(state, active_prefixes, page_prefixes):
+    """
+    Elimina del estado las claves de páginas que no están activas.
+    page_prefixes son los prefijos de todas las páginas y active_prefixes
+    los de la página actual. Retorna las claves eliminadas.
+    """
+    stale_prefixes = tuple(p for p in page_prefixes if p not in active_prefixes)
+    if not stale_prefixes:
+        return []
+    removed = [
+        key for key in list(state.keys())
+        if key.startswith(stale_prefixes) and not key.startswith(tuple(active_prefixes))
+    ]
+    for key in removed:
+        del state[key]
+    return removed
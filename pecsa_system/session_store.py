@@ -0,0 +1,223 @@
+"""
+Módulo de almacenamiento compartido de sesiones
+Sistema de Información PECSA
+
+Permite que una sesión iniciada en una réplica de la aplicación sea válida en
+cualquier otra, y que sobreviva a reinicios, sin depender de balanceo con
+afinidad. Se activa con SESSION_STORE=postgres (tabla app_sessions) o
+SESSION_STORE=memory (sustituto local, para desarrollo con un solo proceso).
+"""
+
+import os
+import hmac
+import time
+import logging
+import hashlib
+import secrets
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from psycopg2.extras import Json
+from database import execute_query
+
+logger = logging.getLogger(__name__)
+
+# Backend del almacén: "postgres", "memory" o vacío (desactivado)
+SESSION_STORE = os.getenv("SESSION_STORE", "").strip().lower()
+
+# Secreto para firmar los tokens; obligatorio y el mismo en todas las réplicas
+# (sin él el almacén queda desactivado)
+SESSION_SECRET = os.getenv("SESSION_SECRET", "")
+
+# Vigencia de una sesión sin actividad (segundos): el token viaja en la URL,
+# así que se mantiene corta y se renueva mientras la sesión está en uso.
+# SESSION_CACHE_TTL es la vigencia de la copia de cada sesión en la caché local
+SESSION_TTL = int(os.getenv("SESSION_TTL", "1800"))
+SESSION_CACHE_TTL = float(os.getenv("SESSION_CACHE_TTL", "30"))
+SESSION_CACHE_SIZE = 1024
+
+# Intervalo entre purgas de sesiones expiradas (segundos)
+SESSION_PURGE_INTERVAL = 3600
+
+# ============================================
+# TOKENS FIRMADOS
+# ============================================
+
+def _sign(session_id):
+    """Firma HMAC-SHA256 (truncada) de un identificador de sesión"""
+    digest = hmac.new(SESSION_SECRET.encode('utf-8'), session_id.encode('utf-8'), hashlib.sha256)
+    return digest.hexdigest()[:32]
+
+def _storage_key(session_id):
+    """Clave de almacenamiento: hash del identificador (el token no se guarda)"""
+    return hashlib.sha256(session_id.encode('utf-8')).hexdigest()
+
+def new_token():
+    """Genera un token de sesión firmado: <id>.<firma>"""
+    session_id = secrets.token_urlsafe(24)
+    return f"{session_id}.{_sign(session_id)}"
+
+def verify_token(token):
+    """Retorna la clave de almacenamiento si la firma del token es válida"""
+    session_id, _, signature = (token or '').partition('.')
+    if not session_id or not hmac.compare_digest(signature, _sign(session_id)):
+        return None
+    return _storage_key(session_id)
+
+# ============================================
+# BACKENDS
+# ============================================
+
+class MemorySessionStore:
+    """Almacén local en memoria (un solo proceso)"""
+
+    def __init__(self):
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._sessions.get(key)
+        if entry and entry[1] > datetime.now():
+            return entry[0]
+        return None
+
+    def put(self, key, user_id, data, expires_at):
+        with self._lock:
+            self._sessions[key] = (data, expires_at)
+
+    def delete(self, key):
+        with self._lock:
+            self._sessions.pop(key, None)
+
+    def purge_expired(self):
+        now = datetime.now()
+        with self._lock:
+            for key in [k for k, (_, expires_at) in self._sessions.items() if expires_at <= now]:
+                del self._sessions[key]
+
+class PostgresSessionStore:
+    """Almacén compartido en la tabla app_sessions"""
+
+    def get(self, key):
+        query = "SELECT data FROM app_sessions WHERE session_key = %s AND expires_at > NOW()"
+        row = execute_query(query, (key,), fetch_one=True, readonly=True)
+        if row is None:
+            # Una sesión recién creada puede no haber llegado aún a la réplica
+            row = execute_query(query, (key,), fetch_one=True, readonly=True, primary=True)
+        return row['data'] if row else None
+
+    def put(self, key, user_id, data, expires_at):
+        query = """
+            INSERT INTO app_sessions (session_key, user_id, data, expires_at)
+            VALUES (%s, %s, %s, %s)
+            ON CONFLICT (session_key) DO UPDATE
+            SET data = EXCLUDED.data, expires_at = EXCLUDED.expires_at
+        """
+        execute_query(query, (key, user_id, Json(data), expires_at))
+
+    def delete(self, key):
+        execute_query("DELETE FROM app_sessions WHERE session_key = %s", (key,))
+
+    def purge_expired(self):
+        execute_query("DELETE FROM app_sessions WHERE expires_at <= NOW()")
+
+# ============================================
+# API
+# ============================================
+
+class SessionStore:
+    """
+    Almacén de sesiones con caché local: las lecturas repetidas de una misma
+    sesión (un rerun tras otro) no van a la base de datos mientras la copia
+    local tenga menos de SESSION_CACHE_TTL segundos.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._last_purge = time.monotonic()
+
+    def create(self, user_id, data):
+        """Crea una sesión y retorna su token firmado"""
+        token = new_token()
+        key = verify_token(token)
+        self.backend.put(key, user_id, data, datetime.now() + timedelta(seconds=SESSION_TTL))
+        self._cache_put(key, data)
+        self._maybe_purge()
+        return token
+
+    def load(self, token):
+        """Retorna los datos de la sesión del token (None si no es válida)"""
+        key = verify_token(token)
+        if key is None:
+            return None
+
+        with self._lock:
+            entry = self._cache.get(key)
+        if entry and time.monotonic() - entry[1] < SESSION_CACHE_TTL:
+            return entry[0]
+
+        data = self.backend.get(key)
+        if data is None:
+            self._cache_drop(key)
+        else:
+            self._cache_put(key, data)
+        return data
+
+    def save(self, token, user_id, data):
+        """Actualiza los datos de una sesión existente y renueva su vigencia"""
+        key = verify_token(token)
+        if key is not None:
+            self.backend.put(key, user_id, data, datetime.now() + timedelta(seconds=SESSION_TTL))
+            self._cache_put(key, data)
+
+    def delete(self, token):
+        """Elimina una sesión"""
+        key = verify_token(token)
+        if key is not None:
+            self.backend.delete(key)
+            self._cache_drop(key)
+
+    def _cache_put(self, key, data):
+        with self._lock:
+            self._cache[key] = (data, time.monotonic())
+            self._cache.move_to_end(key)
+            while len(self._cache) > SESSION_CACHE_SIZE:
+                self._cache.popitem(last=False)
+
+    def _cache_drop(self, key):
+        with self._lock:
+            self._cache.pop(key, None)
+
+    def _maybe_purge(self):
+        if time.monotonic() - self._last_purge > SESSION_PURGE_INTERVAL:
+            self._last_purge = time.monotonic()
+            self.backend.purge_expired()
+
+_BACKENDS = {
+    'memory': MemorySessionStore,
+    'postgres': PostgresSessionStore,
+}
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_session_store():
+    """Retorna el almacén de sesiones configurado (None si está desactivado)"""
+    global _store
+    if SESSION_STORE not in _BACKENDS:
+        return None
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                if not SESSION_SECRET:
+                    # Un secreto aleatorio por proceso invalidaría los tokens en
+                    # las demás réplicas y tras cada reinicio
+                    logger.error("SESSION_STORE=%s requiere SESSION_SECRET; almacén de sesiones desactivado",
+                                 SESSION_STORE)
+                    _store = False
+                else:
+                    _store = SessionStore(_BACKENDS[SESSION_STORE]())
+    return _store or None
@@ -0,0 +1,25 @@
+"""
+Páginas de la aplicación, cargadas bajo demanda
+Sistema de Información PECSA
+"""
+
+import sys
+import time
+import importlib
+
+# Tiempos de importación (ms) registrados en este proceso: dependencias base
+# de la aplicación y primera carga de cada página
+IMPORT_TIMINGS = {}
+
+def load_page(module_name):
+    """
+    Importa el módulo de una página la primera vez que se selecciona y
+    registra cuánto tardó; en los reruns siguientes se reutiliza
+    """
+    full_name = f"{__name__}.{module_name}"
+    module = sys.modules.get(full_name)
+    if module is None:
+        start = time.perf_counter()
+        module = importlib.import_module(full_name)
+        IMPORT_TIMINGS[module_name] = (time.perf_counter() - start) * 1000
+    return module
@@ -0,0 +1,129 @@
+"""
+Página de reportes de actividad de usuarios
+Sistema de Información PECSA
+"""
+
+import streamlit as st
+import pandas as pd
+from models import ActivityReportModel
+from views.common import fragment, section_selector
+
+PAGE_SIZE = 50
+
+def _paged_report(fetch, key, columns):
+    """
+    Muestra un reporte paginado en SQL (LIMIT/OFFSET) y su exportación a CSV.
+    fetch(limit, offset) retorna filas con total_count; columns mapea columna -> título.
+    """
+    page = st.session_state.get(f"{key}_page", 0)
+    rows = fetch(PAGE_SIZE, page * PAGE_SIZE)
+    total = rows[0]['total_count'] if rows else 0
+
+    if not rows and page > 0:
+        # La página guardada quedó fuera de rango (el reporte se redujo desde
+        # que se navegó hasta ella): volver a la primera
+        st.session_state[f"{key}_page"] = 0
+        st.rerun()
+    if not rows:
+        st.info("No hay usuarios en este reporte")
+        return
+
+    df = pd.DataFrame(rows)
+    df['Colaborador'] = df['first_name'] + ' ' + df['last_name']
+    df['is_active'] = df['is_active'].map({True: '✅ Activo', False: '❌ Inactivo'})
+    if 'last_login' in df:
+        df['last_login'] = df['last_login'].dt.strftime('%d/%m/%Y %H:%M')
+    df_display = df[list(columns)]
+    df_display.columns = list(columns.values())
+    st.dataframe(df_display, use_container_width=True, hide_index=True)
+
+    pages = (total + PAGE_SIZE - 1) // PAGE_SIZE
+    col1, col2, col3, col4 = st.columns([1, 2, 1, 2])
+    with col1:
+        if st.button("⬅️ Anterior", key=f"{key}_prev", disabled=page == 0, use_container_width=True):
+            st.session_state[f"{key}_page"] = page - 1
+            st.rerun()
+    with col2:
+        st.caption(f"Página {page + 1} de {pages} · {total} usuarios")
+    with col3:
+        if st.button("Siguiente ➡️", key=f"{key}_next", disabled=page + 1 >= pages, use_container_width=True):
+            st.session_state[f"{key}_page"] = page + 1
+            st.rerun()
+    with col4:
+        # El CSV completo solo se consulta cuando se solicita
+        if st.button("📄 Generar CSV", key=f"{key}_csv", use_container_width=True):
+            export = pd.DataFrame(fetch(None, 0)).drop(columns=['total_count'])
+            st.download_button(
+                "⬇️ Descargar CSV",
+                export.to_csv(index=False).encode('utf-8'),
+                file_name=f"{key}.csv",
+                mime="text/csv",
+                use_container_width=True
+            )
+
+@fragment
+def _inactive_section():
+    """Sección: usuarios sin acceso en los últimos N días"""
+    days = st.number_input("Días sin acceso", min_value=1, value=30, step=1)
+
+    # Reiniciar la paginación si cambia el umbral
+    if st.session_state.get('activity_inactive_days') != days:
+        st.session_state.activity_inactive_days = days
+        st.session_state.activity_inactive_page = 0
+
+    _paged_report(
+        lambda limit, offset: ActivityReportModel.get_inactive_users(days, limit, offset),
+        "activity_inactive",
+        {'id': 'ID', 'username': 'Usuario', 'Colaborador': 'Colaborador',
+         'is_active': 'Estado', 'last_login': 'Último acceso'}
+    )
+
+@fragment
+def _never_section():
+    """Sección: usuarios que nunca iniciaron sesión"""
+    _paged_report(
+        ActivityReportModel.get_never_logged_in,
+        "activity_never",
+        {'id': 'ID', 'username': 'Usuario', 'Colaborador': 'Colaborador', 'is_active': 'Estado'}
+    )
+
+@fragment
+def _logins_section():
+    """Sección: inicios de sesión por día o semana"""
+    col1, col2 = st.columns(2)
+    with col1:
+        period = st.selectbox("Agrupar por", ["day", "week"],
+                              format_func=lambda x: "Día" if x == "day" else "Semana")
+    with col2:
+        days = st.number_input("Últimos días", min_value=1, max_value=366, value=30, step=1)
+
+    rows = ActivityReportModel.get_logins_per_period(period, days)
+    if not rows:
+        st.info("No hay inicios de sesión registrados en el periodo")
+        return
+
+    df = pd.DataFrame(rows)
+    st.bar_chart(df.set_index('period')['logins'])
+
+    df['period'] = df['period'].dt.strftime('%d/%m/%Y')
+    df.columns = ['Periodo', 'Ingresos', 'Usuarios distintos']
+    st.dataframe(df, use_container_width=True, hide_index=True)
+    st.download_button(
+        "⬇️ Descargar CSV",
+        df.to_csv(index=False).encode('utf-8'),
+        file_name=f"ingresos_por_{period}.csv",
+        mime="text/csv"
+    )
+
+def show_activity_page():
+    """Muestra la página de reportes de actividad"""
+    st.markdown('<h1 class="main-header">📈 Actividad de Usuarios</h1>', unsafe_allow_html=True)
+
+    section = section_selector(["😴 Inactivos", "🚫 Nunca ingresaron", "📅 Ingresos por periodo"], key="activity_section")
+
+    if section == "😴 Inactivos":
+        _inactive_section()
+    elif section == "🚫 Nunca ingresaron":
+        _never_section()
+    elif section == "📅 Ingresos por periodo":
+        _logins_section()
@@ -0,0 +1,55 @@
+"""
+Página del log de auditoría
+Sistema de Información PECSA
+"""
+
+import json
+import streamlit as st
+import pandas as pd
+from models import AuditLogModel
+
+def show_audit_page():
+    """Muestra el log de auditoría de acciones administrativas"""
+    st.markdown('<h1 class="main-header">📜 Auditoría</h1>', unsafe_allow_html=True)
+
+    # Pila de cursores (created_at, id) de las páginas visitadas
+    if 'audit_cursors' not in st.session_state:
+        st.session_state.audit_cursors = [None]
+
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        action_filter = st.text_input("🔍 Acción", placeholder="Ej.: user.delete", key="audit_action_filter")
+    with col2:
+        page_size = st.selectbox("Por página", [25, 50, 100], index=1, key="audit_page_size")
+
+    # Reiniciar la paginación si cambian los filtros
+    filters = (action_filter.strip(), page_size)
+    if st.session_state.get('audit_filters') != filters:
+        st.session_state.audit_filters = filters
+        st.session_state.audit_cursors = [None]
+
+    cursors = st.session_state.audit_cursors
+    events = AuditLogModel.get_page(before=cursors[-1], action=filters[0] or None, limit=page_size)
+
+    if events:
+        df = pd.DataFrame(events)
+        df['created_at'] = df['created_at'].dt.strftime('%d/%m/%Y %H:%M:%S')
+        df['details'] = df['details'].map(lambda d: json.dumps(d, ensure_ascii=False, default=str) if d else '')
+        df_display = df[['created_at', 'actor_username', 'action', 'entity_type', 'entity_id', 'details']]
+        df_display.columns = ['Fecha', 'Usuario', 'Acción', 'Entidad', 'ID', 'Detalles']
+        st.dataframe(df_display, use_container_width=True, hide_index=True)
+    else:
+        st.info("No hay eventos registrados")
+
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        if st.button("⬅️ Anterior", disabled=len(cursors) == 1, use_container_width=True):
+            cursors.pop()
+            st.rerun()
+    with col2:
+        st.caption(f"Página {len(cursors)}")
+    with col3:
+        if st.button("Siguiente ➡️", disabled=len(events) < page_size, use_container_width=True):
+            last = events[-1]
+            cursors.append((last['created_at'], last['id']))
+            st.rerun()
@@ -0,0 +1,198 @@
+"""
+Página de gestión de colaboradores
+Sistema de Información PECSA
+"""
+
+import streamlit as st
+import pandas as pd
+from models import CollaboratorModel
+from database import unit_of_work
+from views.common import (
+    fragment, section_selector, audit_action, keep_selection, option_index,
+    normalize_query, normalize_series, IncrementalSearch, SEARCH_MIN_LENGTH, SEARCH_RESULT_LIMIT
+)
+
+@fragment
+def _list_section():
+    """Sección: listado y acciones sobre colaboradores"""
+    # Filtros
+    col1, col2, col3 = st.columns([2, 2, 1])
+    with col1:
+        search = st.text_input("🔍 Buscar", placeholder="Nombre o documento...", key="collaborators_search")
+    with col2:
+        status_filter = st.selectbox("Estado", ["Todos", "Activos", "Inactivos"], key="collaborators_status")
+    with col3:
+        st.write("")
+        if st.button("🔄 Actualizar", use_container_width=True):
+            st.rerun()
+
+    # Obtener colaboradores (DataFrame construido por columnas)
+    df = CollaboratorModel.get_all(as_frame=True)
+
+    # Búsqueda incremental: consultas normalizadas, texto normalizado construido
+    # una vez por versión de los datos y compartido por el proceso, y resultados
+    # recordados por sesión, refinados a partir de la consulta anterior cuando
+    # la extiende
+    query = normalize_query(search)
+    if len(query) >= SEARCH_MIN_LENGTH and not df.empty:
+        fingerprint = (len(df), df['id'].max(), df['updated_at'].max())
+        searcher = st.session_state.setdefault('collaborators_search_cache', IncrementalSearch('collaborators'))
+        matched_ids = searcher.search(
+            fingerprint,
+            lambda: normalize_series(
+                df['first_name'] + ' ' + df['last_name'] + ' | ' + df['document_number'].fillna('')
+            ).set_axis(df['id']),
+            query
+        )
+        df = df[df['id'].isin(matched_ids)]
+    elif search and len(query) < SEARCH_MIN_LENGTH:
+        st.caption(f"Escriba al menos {SEARCH_MIN_LENGTH} caracteres para buscar")
+
+    # Aplicar filtros
+    if status_filter == "Activos":
+        df = df[df['status'] == 'active']
+    elif status_filter == "Inactivos":
+        df = df[df['status'] == 'inactive']
+
+    total_matches = len(df)
+    if total_matches > SEARCH_RESULT_LIMIT:
+        # Conservar el colaborador seleccionado (p. ej. desde la búsqueda global)
+        # aunque quede fuera de las primeras filas
+        selected = st.session_state.get('collaborators_selected')
+        head = df.head(SEARCH_RESULT_LIMIT)
+        if selected is not None and selected not in head['id'].values and selected in df['id'].values:
+            head = pd.concat([df[df['id'] == selected], head])
+        df = head
+        st.caption(f"Mostrando {SEARCH_RESULT_LIMIT} de {total_matches} colaboradores; refine la búsqueda")
+
+    # Mostrar tabla
+    if not df.empty:
+        full_name = df['first_name'] + ' ' + df['last_name']
+        df_display = pd.DataFrame({
+            'ID': df['id'],
+            'Documento': df['document_number'],
+            'Nombre': full_name,
+            'Cargo': df['position'],
+            'Teléfono': df['phone'],
+            'Email': df['email'],
+            'Estado': df['status'].map({'active': '✅ Activo', 'inactive': '❌ Inactivo'}),
+        })
+
+        st.dataframe(df_display, use_container_width=True, hide_index=True)
+
+        # Acciones
+        st.markdown("### ⚙️ Acciones")
+        col1, col2 = st.columns(2)
+
+        with col1:
+            collaborator_ids, labels = option_index(df, "{first_name} {last_name} ({document_number})")
+            keep_selection('collaborators_selected', collaborator_ids)
+            selected_id = st.selectbox(
+                "Seleccionar colaborador",
+                options=collaborator_ids,
+                key="collaborators_selected",
+                format_func=labels.get
+            )
+
+        with col2:
+            action = st.selectbox("Acción", ["Seleccionar...", "Editar", "Desactivar", "Activar"])
+
+            if st.button("Ejecutar", type="primary", use_container_width=True):
+                if action == "Editar":
+                    st.session_state.edit_collaborator_id = selected_id
+                    st.rerun()
+                elif action == "Desactivar":
+                    CollaboratorModel.set_status(selected_id, 'inactive')
+                    audit_action("collaborator.deactivate", "collaborator", selected_id)
+                    st.success("✅ Colaborador desactivado")
+                    st.rerun()
+                elif action == "Activar":
+                    CollaboratorModel.set_status(selected_id, 'active')
+                    audit_action("collaborator.activate", "collaborator", selected_id)
+                    st.success("✅ Colaborador activado")
+                    st.rerun()
+    else:
+        st.info("No se encontraron colaboradores")
+
+@fragment
+def _new_section():
+    """Sección: registro de nuevo colaborador"""
+    st.markdown("### 📝 Registro de Nuevo Colaborador")
+
+    with st.form("new_collaborator_form"):
+        col1, col2 = st.columns(2)
+
+        with col1:
+            document = st.text_input("Número de Documento*", max_chars=20)
+            first_name = st.text_input("Nombres*", max_chars=100)
+            last_name = st.text_input("Apellidos*", max_chars=100)
+
+        with col2:
+            position = st.text_input("Cargo*", max_chars=100)
+            phone = st.text_input("Teléfono", max_chars=20)
+            email = st.text_input("Email", max_chars=100)
+
+        status = st.selectbox("Estado", ["active", "inactive"], format_func=lambda x: "Activo" if x == "active" else "Inactivo")
+
+        submit = st.form_submit_button("💾 Guardar Colaborador", use_container_width=True, type="primary")
+
+        if submit:
+            if document and first_name and last_name and position:
+                data = {
+                    'document_number': document,
+                    'first_name': first_name,
+                    'last_name': last_name,
+                    'position': position,
+                    'phone': phone,
+                    'email': email,
+                    'status': status
+                }
+                # Verificar si el documento ya existe y crear en una sola transacción
+                with unit_of_work():
+                    existing = CollaboratorModel.get_by_document(document)
+                    created = None if existing else CollaboratorModel.create(data)
+
+                if existing:
+                    st.error("❌ Ya existe un colaborador con ese número de documento")
+                else:
+                    audit_action("collaborator.create", "collaborator", created['id'],
+                                 document_number=document)
+                    st.success("✅ Colaborador registrado exitosamente")
+                    st.rerun()
+            else:
+                st.warning("⚠️ Complete todos los campos obligatorios")
+
+@fragment
+def _stats_section():
+    """Sección: estadísticas de colaboradores"""
+    st.markdown("### 📊 Estadísticas de Colaboradores")
+
+    df_status = CollaboratorModel.get_all(as_frame=True)
+
+    if not df_status.empty:
+        col1, col2 = st.columns(2)
+
+        with col1:
+            # Estado de colaboradores
+            status_counts = df_status['status'].value_counts()
+            st.metric("Total de Colaboradores", len(df_status))
+            st.bar_chart(status_counts)
+
+        with col2:
+            # Por cargo
+            position_counts = df_status['position'].value_counts().head(5)
+            st.metric("Cargos Únicos", df_status['position'].nunique())
+            st.bar_chart(position_counts)
+
+def show_collaborators_page():
+    """Muestra la página de gestión de colaboradores"""
+    st.markdown('<h1 class="main-header">👥 Gestión de Colaboradores</h1>', unsafe_allow_html=True)
+
+    section = section_selector(["📋 Lista de Colaboradores", "➕ Nuevo Colaborador", "📊 Estadísticas"], key="collaborators_section")
+
+    if section == "📋 Lista de Colaboradores":
+        _list_section()
+    elif section == "➕ Nuevo Colaborador":
+        _new_section()
+    elif section == "📊 Estadísticas":
+        _stats_section()
@@ -0,0 +1,157 @@
+"""
+Utilidades compartidas por las páginas
+Sistema de Información PECSA
+"""
+
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+import streamlit as st
+from audit import log_action
+
+# Reruns parciales: en versiones de Streamlit que soportan fragmentos, una
+# interacción dentro de una sección solo re-ejecuta esa sección
+fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None) or (lambda func: func)
+
+def section_selector(sections, key):
+    """
+    Selector de secciones de una página. A diferencia de st.tabs, que ejecuta
+    el contenido de todas las pestañas en cada rerun, solo la sección activa
+    se ejecuta y consulta la base de datos.
+    """
+    return st.radio("Sección", sections, horizontal=True, key=key, label_visibility="collapsed")
+
+def audit_action(action, entity_type=None, entity_id=None, **details):
+    """Registra una acción del usuario actual en el log de auditoría"""
+    principal = st.session_state.principal
+    log_action(action, entity_type, entity_id, details or None,
+               actor_id=principal.id, actor_username=principal.username)
+
+def keep_selection(key, ids):
+    """
+    Prepara el estado de un selector con clave estable (la búsqueda global
+    escribe en esa clave el id de la entidad a seleccionar): descarta el valor
+    guardado si ya no está entre las opciones, p. ej. tras desactivar o
+    eliminar la entidad
+    """
+    if key in st.session_state and st.session_state[key] not in ids:
+        del st.session_state[key]
+
+# ============================================
+# ÍNDICES DE OPCIONES PARA SELECTORES
+# ============================================
+
+def option_index(rows, template, key='id'):
+    """
+    Retorna (ids, etiquetas) para un selector: la lista de ids en el orden de
+    rows y un dict id -> etiqueta construido con template ("{username} -
+    {first_name} {last_name}"), de modo que format_func=etiquetas.get resuelva
+    cada opción en O(1). rows es una lista de filas o un DataFrame.
+    """
+    records = rows.to_dict('records') if isinstance(rows, pd.DataFrame) else rows
+    ids = [row[key] for row in records]
+    labels = {row[key]: template.format(**row) for row in records}
+    return ids, labels
+
+# ============================================
+# BÚSQUEDA INCREMENTAL
+# ============================================
+
+# Longitud mínima de una consulta, consultas recordadas y filas mostradas
+SEARCH_MIN_LENGTH = 2
+SEARCH_CACHE_SIZE = 16
+SEARCH_RESULT_LIMIT = 200
+
+# Versiones de texto normalizado conservadas por proceso (todas las tablas)
+SEARCH_HAYSTACK_VERSIONS = 4
+
+def normalize_query(text):
+    """Minúsculas, sin tildes y con espacios colapsados"""
+    text = unicodedata.normalize('NFKD', text or '').encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r'\s+', ' ', text).strip().lower()
+
+def normalize_series(series):
+    """normalize_query aplicado por columna a una serie de textos"""
+    return (
+        series.fillna('')
+        .str.normalize('NFKD').str.encode('ascii', 'ignore').str.decode('ascii')
+        .str.replace(r'\s+', ' ', regex=True).str.strip().str.lower()
+    )
+
+_haystacks = OrderedDict()
+_haystacks_lock = threading.Lock()
+
+def shared_haystack(name, fingerprint, build_haystack):
+    """
+    Retorna la columna de texto normalizado de la tabla name en la versión
+    identificada por fingerprint. Se construye una vez por proceso y la
+    comparten todas las sesiones; se conservan las últimas
+    SEARCH_HAYSTACK_VERSIONS versiones con desalojo LRU.
+    """
+    key = (name, fingerprint)
+    with _haystacks_lock:
+        haystack = _haystacks.get(key)
+        if haystack is not None:
+            _haystacks.move_to_end(key)
+            return haystack
+
+    # Construir fuera del lock; si otra sesión ganó la carrera se usa la suya
+    haystack = build_haystack()
+    with _haystacks_lock:
+        haystack = _haystacks.setdefault(key, haystack)
+        _haystacks.move_to_end(key)
+        while len(_haystacks) > SEARCH_HAYSTACK_VERSIONS:
+            _haystacks.popitem(last=False)
+    return haystack
+
+class IncrementalSearch:
+    """
+    Búsqueda por subcadena sobre una columna de texto normalizado. La columna
+    es compartida por el proceso (shared_haystack) y se construye una sola vez
+    por versión de los datos, identificada por una huella barata (p. ej. filas
+    e id / updated_at máximos). Cada sesión guarda solo los resultados de sus
+    últimas consultas con desalojo LRU; si la nueva consulta extiende una
+    anterior ("gar" -> "garc"), solo filtra las filas que ya coincidían con
+    ella en lugar de toda la tabla.
+    """
+
+    def __init__(self, name, max_entries=SEARCH_CACHE_SIZE):
+        self.name = name
+        self.max_entries = max_entries
+        self.fingerprint = None
+        self.results = OrderedDict()
+
+    def search(self, fingerprint, build_haystack, query):
+        """
+        Retorna los valores del índice de la columna (ids) cuyas filas contienen
+        query. build_haystack solo se llama cuando cambia la huella y debe
+        retornar la serie normalizada indexada por id.
+        """
+        haystack = shared_haystack(self.name, fingerprint, build_haystack)
+        if fingerprint != self.fingerprint:
+            self.fingerprint = fingerprint
+            self.results.clear()
+
+        if query in self.results:
+            self.results.move_to_end(query)
+            positions = self.results[query]
+        else:
+            # Partir del resultado de la consulta previa más larga que sea prefijo
+            base = None
+            for previous in sorted(self.results, key=len, reverse=True):
+                if query.startswith(previous):
+                    base = self.results[previous]
+                    break
+            if base is None:
+                base = np.arange(len(haystack), dtype=np.int32)
+
+            matches = haystack.iloc[base].str.contains(query, regex=False).to_numpy()
+            positions = base[matches]
+
+            self.results[query] = positions
+            if len(self.results) > self.max_entries:
+                self.results.popitem(last=False)
+        return haystack.index[positions]
@@ -0,0 +1,82 @@
+"""
+Página principal (dashboard)
+Sistema de Información PECSA
+"""
+
+import streamlit as st
+from auth import is_admin
+from models import CollaboratorModel, UserModel, RoleModel
+
+def show_dashboard():
+    """Muestra el dashboard principal"""
+    principal = st.session_state.principal
+    # El perfil no se guarda en la sesión: se consulta por clave primaria
+    profile = UserModel.get_by_id(principal.id)
+    previous_login = principal.previous_login
+
+    st.markdown(f"""
+    <div class="info-box">
+        <h2>👋 Bienvenido, {principal.display_name}</h2>
+        <p><strong>Cargo:</strong> {profile['position'] if profile else ''}</p>
+        <p><strong>Roles:</strong> {', '.join(principal.roles) if principal.roles else 'Sin roles asignados'}</p>
+        <p><strong>Último acceso:</strong> {previous_login.strftime('%d/%m/%Y %H:%M') if previous_login else 'Primer acceso'}</p>
+    </div>
+    """, unsafe_allow_html=True)
+
+    # Estadísticas del sistema (solo para admin)
+    if is_admin():
+        st.markdown('<h2 class="sub-header">📊 Estadísticas del Sistema</h2>', unsafe_allow_html=True)
+
+        col1, col2, col3, col4 = st.columns(4)
+
+        # Obtener estadísticas
+        collaborators = CollaboratorModel.get_all()
+        users = UserModel.get_all()
+        roles = RoleModel.get_all()
+
+        active_collaborators = [c for c in collaborators if c['status'] == 'active']
+        active_users = [u for u in users if u['is_active']]
+
+        with col1:
+            st.metric(
+                label="👥 Colaboradores",
+                value=len(collaborators),
+                delta=f"{len(active_collaborators)} activos"
+            )
+
+        with col2:
+            st.metric(
+                label="👤 Usuarios",
+                value=len(users),
+                delta=f"{len(active_users)} activos"
+            )
+
+        with col3:
+            st.metric(
+                label="🎭 Roles",
+                value=len(roles)
+            )
+
+        with col4:
+            st.metric(
+                label="✅ Estado del Sistema",
+                value="Operativo",
+                delta="100%"
+            )
+
+    # Información según el rol
+    st.markdown('<h2 class="sub-header">🚀 Accesos Rápidos</h2>', unsafe_allow_html=True)
+
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        if is_admin():
+            st.info("**Administración**\n\nGestiona usuarios, colaboradores y roles del sistema")
+
+    with col2:
+        if 'Ventas' in principal.roles or is_admin():
+            st.info("**Módulo de Ventas**\n\n(Próximamente)")
+
+    with col3:
+        if 'Compras' in principal.roles or is_admin():
+            st.info("**Módulo de Compras**\n\n(Próximamente)")
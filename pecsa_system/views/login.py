@@ -0,0 +1,51 @@
+"""
+Página de inicio de sesión
+Sistema de Información PECSA
+"""
+
+import streamlit as st
+from auth import login_user
+
+def show_login_page():
+    """Muestra la página de login"""
+    st.markdown('<h1 class="main-header">⛽ Sistema PECSA</h1>', unsafe_allow_html=True)
+
+    col1, col2, col3 = st.columns([1, 2, 1])
+
+    with col2:
+        st.markdown('<h2 class="sub-header">🔐 Inicio de Sesión</h2>', unsafe_allow_html=True)
+
+        with st.form("login_form"):
+            username = st.text_input("👤 Usuario", placeholder="Ingrese su usuario")
+            password = st.text_input("🔑 Contraseña", type="password", placeholder="Ingrese su contraseña")
+            submit = st.form_submit_button("Ingresar", use_container_width=True, type="primary")
+
+            if submit:
+                if username and password:
+                    if login_user(username, password):
+                        st.success("✅ Inicio de sesión exitoso!")
+                        st.rerun()
+                    else:
+                        st.error("❌ Usuario o contraseña incorrectos")
+                else:
+                    st.warning("⚠️ Por favor complete todos los campos")
+
+        # Información de usuarios de prueba
+        with st.expander("ℹ️ Usuarios de Prueba"):
+            st.markdown("""
+            **Administrador:**
+            - Usuario: `admin`
+            - Contraseña: `Admin123!`
+
+            **Ventas:**
+            - Usuario: `ventas`
+            - Contraseña: `Ventas123!`
+
+            **Compras:**
+            - Usuario: `compras`
+            - Contraseña: `Compras123!`
+
+            **Finanzas:**
+            - Usuario: `finanzas`
+            - Contraseña: `Finanzas123!`
+            """)
@@ -0,0 +1,185 @@
+"""
+Página de gestión de roles
+Sistema de Información PECSA
+"""
+
+import streamlit as st
+import pandas as pd
+from models import UserModel, RoleModel, UserRoleModel
+from database import unit_of_work
+from views.common import fragment, section_selector, audit_action, keep_selection, option_index
+
+@fragment
+def _list_section():
+    """Sección: listado y acciones sobre roles"""
+    roles = RoleModel.get_all(as_frame=True)
+
+    if not roles.empty:
+        df_display = pd.DataFrame({
+            'ID': roles['id'],
+            'Nombre': roles['name'],
+            'Descripción': roles['description'].fillna('').replace('', 'Sin descripción'),
+            'Permisos': roles['permissions'].fillna('').replace('', 'Sin permisos definidos'),
+            'Usuarios': roles['user_count']
+        })
+        st.dataframe(df_display, use_container_width=True, hide_index=True)
+
+        # Acciones
+        editable_roles = roles[roles['name'] != 'Administrador']
+        if not editable_roles.empty:
+            st.markdown("### ⚙️ Acciones")
+            col1, col2, col3 = st.columns(3)
+
+            with col1:
+                role_ids, role_names = option_index(editable_roles, "{name}")
+                user_counts = dict(zip(role_ids, editable_roles['user_count'].tolist()))
+                keep_selection('roles_selected', role_ids)
+                selected_role = st.selectbox(
+                    "Seleccionar rol",
+                    options=role_ids,
+                    key="roles_selected",
+                    format_func=role_names.get
+                )
+
+            with col2:
+                action = st.selectbox("Acción", ["Seleccionar...", "Editar", "Eliminar"])
+
+            with col3:
+                st.write("")
+                if st.button("Ejecutar", type="primary", use_container_width=True):
+                    if action == "Eliminar":
+                        user_count = user_counts[selected_role]
+                        if user_count == 0:
+                            RoleModel.delete(selected_role)
+                            audit_action("role.delete", "role", selected_role, name=role_names[selected_role])
+                            st.success("✅ Rol eliminado")
+                            st.rerun()
+                        else:
+                            st.error(f"❌ No se puede eliminar. El rol tiene {user_count} usuarios asignados")
+    else:
+        st.info("No hay roles registrados")
+
+@fragment
+def _new_section():
+    """Sección: creación de nuevo rol"""
+    st.markdown("### 📝 Crear Nuevo Rol")
+
+    with st.form("new_role_form"):
+        name = st.text_input("Nombre del Rol*", max_chars=50)
+        description = st.text_area("Descripción", max_chars=500)
+
+        st.markdown("#### Permisos")
+        col1, col2, col3 = st.columns(3)
+
+        permissions = []
+        with col1:
+            st.markdown("**Ventas**")
+            if st.checkbox("Lectura de ventas"):
+                permissions.append("sales_read")
+            if st.checkbox("Escritura de ventas"):
+                permissions.append("sales_write")
+            if st.checkbox("Gestión de clientes"):
+                permissions.append("customers_read")
+
+        with col2:
+            st.markdown("**Compras**")
+            if st.checkbox("Lectura de compras"):
+                permissions.append("purchases_read")
+            if st.checkbox("Escritura de compras"):
+                permissions.append("purchases_write")
+            if st.checkbox("Gestión de proveedores"):
+                permissions.append("suppliers_read")
+
+        with col3:
+            st.markdown("**Finanzas**")
+            if st.checkbox("Lectura de finanzas"):
+                permissions.append("finance_read")
+            if st.checkbox("Escritura de finanzas"):
+                permissions.append("finance_write")
+            if st.checkbox("Reportes"):
+                permissions.append("reports_read")
+
+        submit = st.form_submit_button("💾 Crear Rol", use_container_width=True, type="primary")
+
+        if submit:
+            if name:
+                data = {
+                    'name': name,
+                    'description': description,
+                    'permissions': ','.join(permissions) if permissions else None
+                }
+                # Verificar que el nombre no exista y crear en una sola transacción
+                with unit_of_work():
+                    existing = RoleModel.get_by_name(name)
+                    created = None if existing else RoleModel.create(data)
+
+                if existing:
+                    st.error("❌ Ya existe un rol con ese nombre")
+                else:
+                    audit_action("role.create", "role", created['id'], name=name)
+                    st.success("✅ Rol creado exitosamente")
+                    st.rerun()
+            else:
+                st.warning("⚠️ El nombre del rol es obligatorio")
+
+@fragment
+def _assign_section():
+    """Sección: asignación de roles a usuarios"""
+    st.markdown("### 👥 Asignación de Roles a Usuarios")
+
+    users = UserModel.get_all()
+    roles = RoleModel.get_all()
+
+    if users and roles:
+        user_ids, user_labels = option_index(users, "{username} - {first_name} {last_name}")
+        role_ids, role_names = option_index(roles, "{name}")
+        col1, col2 = st.columns(2)
+
+        with col1:
+            selected_user = st.selectbox(
+                "Seleccionar Usuario",
+                options=user_ids,
+                format_func=user_labels.get
+            )
+
+            if selected_user:
+                user_roles = UserRoleModel.get_user_roles(selected_user)
+                current_role_ids = [r['id'] for r in user_roles]
+
+                st.markdown("**Roles actuales:**")
+                if user_roles:
+                    for role in user_roles:
+                        st.write(f"• {role['name']}")
+                else:
+                    st.write("Sin roles asignados")
+
+        with col2:
+            st.markdown("**Asignar/Modificar Roles:**")
+
+            selected_roles = st.multiselect(
+                "Seleccionar roles",
+                options=role_ids,
+                default=current_role_ids,
+                format_func=role_names.get
+            )
+
+            if st.button("💾 Guardar Cambios", type="primary", use_container_width=True):
+                UserRoleModel.update_user_roles(selected_user, selected_roles)
+                audit_action("user.roles_update", "user", selected_user, role_ids=selected_roles)
+                st.success("✅ Roles actualizados exitosamente")
+                st.rerun()
+    else:
+        st.info("No hay usuarios o roles disponibles")
+
+def show_roles_page():
+    """Muestra la página de gestión de roles"""
+    st.markdown('<h1 class="main-header">🎭 Gestión de Roles</h1>', unsafe_allow_html=True)
+
+    section = section_selector(["📋 Lista de Roles", "➕ Nuevo Rol", "👥 Asignación de Roles"], key="roles_section")
+
+    if section == "📋 Lista de Roles":
+        _list_section()
+    elif section == "➕ Nuevo Rol":
+        _new_section()
+    elif section == "👥 Asignación de Roles":
+        _assign_section()
@@ -0,0 +1,55 @@
+"""
+Búsqueda global (barra lateral)
+Sistema de Información PECSA
+"""
+
+import streamlit as st
+from models import SearchModel
+
+# Tipo de entidad -> (página, clave del selector de sección, sección de listado,
+# clave del selector de la entidad, ícono)
+ENTITY_TARGETS = {
+    'collaborator': ("👥 Colaboradores", "collaborators_section", "📋 Lista de Colaboradores", "collaborators_selected", "👥"),
+    'user': ("👤 Usuarios", "users_section", "📋 Lista de Usuarios", "users_selected", "👤"),
+    'role': ("🎭 Roles", "roles_section", "📋 Lista de Roles", "roles_selected", "🎭"),
+}
+
+# Filtros del listado que se restablecen para que la entidad sea visible
+ENTITY_FILTERS = {
+    'collaborator': {'collaborators_search': "", 'collaborators_status': "Todos"},
+}
+
+# Mínimo de caracteres para consultar y máximo de resultados mostrados
+MIN_SEARCH_LENGTH = 2
+MAX_SEARCH_RESULTS = 8
+
+def _jump_to(entity_type, entity_id):
+    """Navega a la página de la entidad y la deja seleccionada"""
+    page, section_key, section, selection_key, _ = ENTITY_TARGETS[entity_type]
+    st.session_state.nav_page = page
+    st.session_state[section_key] = section
+    st.session_state[selection_key] = entity_id
+    for key, value in ENTITY_FILTERS.get(entity_type, {}).items():
+        st.session_state[key] = value
+
+def show_global_search():
+    """Muestra la búsqueda global y sus resultados con acceso directo"""
+    term = st.text_input("🔎 Búsqueda global", placeholder="Nombre, documento, usuario o rol...")
+
+    if len(term.strip()) < MIN_SEARCH_LENGTH:
+        return
+
+    results = SearchModel.search(term, limit=MAX_SEARCH_RESULTS)
+    if not results:
+        st.caption("Sin resultados")
+        return
+
+    for result in results:
+        icon = ENTITY_TARGETS[result['entity_type']][4]
+        st.button(
+            f"{icon} {result['label']}",
+            key=f"search_{result['entity_type']}_{result['entity_id']}",
+            on_click=_jump_to,
+            args=(result['entity_type'], result['entity_id']),
+            use_container_width=True
+        )
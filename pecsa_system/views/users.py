@@ -0,0 +1,233 @@
+"""
+Página de gestión de usuarios
+Sistema de Información PECSA
+"""
+
+import re
+import unicodedata
+import streamlit as st
+import pandas as pd
+from models import CollaboratorModel, UserModel, RoleModel
+from database import unit_of_work
+from views.common import fragment, section_selector, audit_action, keep_selection, option_index
+
+@fragment
+def _list_section():
+    """Sección: listado y acciones sobre usuarios"""
+    # Obtener usuarios (DataFrame construido por columnas)
+    df = UserModel.get_all(as_frame=True)
+
+    if not df.empty:
+        # Preparar datos para mostrar con operaciones por columna
+        full_name = df['first_name'] + ' ' + df['last_name']
+        df_display = pd.DataFrame({
+            'ID': df['id'],
+            'Usuario': df['username'],
+            'Colaborador': full_name,
+            'Documento': df['document_number'],
+            'Cargo': df['position'],
+            'Roles': df['roles'].str.join(', ').replace('', 'Sin roles'),
+            'Estado': df['is_active'].map({True: '✅ Activo', False: '❌ Inactivo'}),
+            'Último acceso': df['last_login'].dt.strftime('%d/%m/%Y %H:%M').fillna('Nunca')
+        })
+        st.dataframe(df_display, use_container_width=True, hide_index=True)
+
+        # Acciones
+        st.markdown("### ⚙️ Acciones")
+        col1, col2, col3 = st.columns(3)
+
+        with col1:
+            user_ids, labels = option_index(df, "{username} - {first_name} {last_name}")
+            usernames = dict(zip(user_ids, df['username']))
+            keep_selection('users_selected', user_ids)
+            selected_user = st.selectbox(
+                "Seleccionar usuario",
+                options=user_ids,
+                key="users_selected",
+                format_func=labels.get
+            )
+
+        with col2:
+            action = st.selectbox("Acción", ["Seleccionar...", "Editar", "Cambiar Contraseña", "Desactivar", "Activar", "Eliminar"])
+
+        with col3:
+            st.write("")
+            if st.button("Ejecutar Acción", type="primary", use_container_width=True):
+                username = usernames[selected_user]
+
+                if action == "Desactivar":
+                    UserModel.set_active(selected_user, False)
+                    audit_action("user.deactivate", "user", selected_user, username=username)
+                    st.success("✅ Usuario desactivado")
+                    st.rerun()
+                elif action == "Activar":
+                    UserModel.set_active(selected_user, True)
+                    audit_action("user.activate", "user", selected_user, username=username)
+                    st.success("✅ Usuario activado")
+                    st.rerun()
+                elif action == "Eliminar":
+                    if st.session_state.principal.id != selected_user:
+                        UserModel.delete(selected_user)
+                        audit_action("user.delete", "user", selected_user, username=username)
+                        st.success("✅ Usuario eliminado")
+                        st.rerun()
+                    else:
+                        st.error("❌ No puedes eliminar tu propio usuario")
+                elif action == "Cambiar Contraseña":
+                    st.session_state.change_password_user = selected_user
+                    st.rerun()
+    else:
+        st.info("No hay usuarios registrados")
+
+@fragment
+def _new_section():
+    """Sección: registro de nuevo usuario"""
+    st.markdown("### 📝 Registro de Nuevo Usuario")
+
+    # Obtener colaboradores sin usuario
+    all_collaborators = CollaboratorModel.get_all('active')
+    users = UserModel.get_all()
+    used_collaborator_ids = {u['collaborator_id'] for u in users if u['collaborator_id']}
+    available_collaborators = [c for c in all_collaborators if c['id'] not in used_collaborator_ids]
+
+    if available_collaborators:
+        collaborator_ids, collaborator_labels = option_index(
+            available_collaborators, "{first_name} {last_name} - {document_number}"
+        )
+        with st.form("new_user_form"):
+            col1, col2 = st.columns(2)
+
+            with col1:
+                selected_collaborator = st.selectbox(
+                    "Colaborador*",
+                    options=collaborator_ids,
+                    format_func=collaborator_labels.get
+                )
+                username = st.text_input("Nombre de Usuario*", max_chars=50)
+
+            with col2:
+                password = st.text_input("Contraseña*", type="password", max_chars=255)
+                password_confirm = st.text_input("Confirmar Contraseña*", type="password", max_chars=255)
+
+            is_active = st.checkbox("Usuario Activo", value=True)
+
+            submit = st.form_submit_button("💾 Crear Usuario", use_container_width=True, type="primary")
+
+            if submit:
+                if username and password and password_confirm:
+                    if password == password_confirm:
+                        data = {
+                            'username': username,
+                            'password': password,
+                            'collaborator_id': selected_collaborator,
+                            'is_active': is_active
+                        }
+                        # Verificar que el username no exista y crear en una sola transacción
+                        with unit_of_work():
+                            existing = UserModel.get_by_username(username)
+                            created = None if existing else UserModel.create(data)
+
+                        if existing:
+                            st.error("❌ El nombre de usuario ya existe")
+                        else:
+                            audit_action("user.create", "user", created['id'], username=username)
+                            st.success("✅ Usuario creado exitosamente")
+                            st.rerun()
+                    else:
+                        st.error("❌ Las contraseñas no coinciden")
+                else:
+                    st.warning("⚠️ Complete todos los campos obligatorios")
+    else:
+        st.info("No hay colaboradores disponibles para crear usuarios. Todos los colaboradores activos ya tienen usuario asignado.")
+
+def suggest_username(first_name, last_name):
+    """Sugiere un nombre de usuario: inicial del nombre + primer apellido, sin tildes"""
+    base = f"{first_name[:1]}{last_name.split()[0] if last_name.split() else ''}"
+    base = unicodedata.normalize('NFKD', base).encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r'[^a-z0-9]', '', base.lower())[:50]
+
+@fragment
+def _bulk_section():
+    """Sección: alta masiva de usuarios"""
+    st.markdown("### 📥 Alta Masiva de Usuarios")
+
+    # Obtener colaboradores sin usuario
+    all_collaborators = CollaboratorModel.get_all('active')
+    users = UserModel.get_all()
+    used_collaborator_ids = {u['collaborator_id'] for u in users if u['collaborator_id']}
+    available_collaborators = [c for c in all_collaborators if c['id'] not in used_collaborator_ids]
+
+    if not available_collaborators:
+        st.info("No hay colaboradores disponibles para crear usuarios. Todos los colaboradores activos ya tienen usuario asignado.")
+        return
+
+    role_ids, role_names = option_index(RoleModel.get_all(), "{name}")
+
+    with st.form("bulk_user_form"):
+        df = pd.DataFrame({
+            'Incluir': False,
+            'collaborator_id': [c['id'] for c in available_collaborators],
+            'Colaborador': [f"{c['first_name']} {c['last_name']}" for c in available_collaborators],
+            'Documento': [c['document_number'] for c in available_collaborators],
+            'Usuario': [suggest_username(c['first_name'], c['last_name']) for c in available_collaborators],
+        })
+        edited = st.data_editor(
+            df,
+            column_config={'collaborator_id': None},
+            disabled=['Colaborador', 'Documento'],
+            hide_index=True,
+            use_container_width=True
+        )
+
+        col1, col2 = st.columns(2)
+        with col1:
+            password = st.text_input("Contraseña inicial*", type="password", max_chars=255)
+        with col2:
+            selected_roles = st.multiselect(
+                "Roles iniciales",
+                options=role_ids,
+                format_func=role_names.get
+            )
+
+        is_active = st.checkbox("Usuarios Activos", value=True)
+
+        submit = st.form_submit_button("💾 Crear Usuarios", use_container_width=True, type="primary")
+
+        if submit:
+            selected = edited[edited['Incluir']]
+            entries = [
+                {
+                    'username': row['Usuario'].strip(),
+                    'password': password,
+                    'collaborator_id': int(row['collaborator_id']),
+                    'is_active': is_active
+                }
+                for row in selected.to_dict('records')
+            ]
+
+            if not entries:
+                st.warning("⚠️ Seleccione al menos un colaborador")
+            elif not password or any(not e['username'] for e in entries):
+                st.warning("⚠️ Complete la contraseña y el usuario de cada colaborador seleccionado")
+            else:
+                with st.spinner("Creando usuarios..."):
+                    created, conflicts = UserModel.bulk_create(entries, selected_roles)
+                audit_action("user.bulk_create", "user", None,
+                             usernames=[c['username'] for c in created], role_ids=selected_roles)
+                if created:
+                    st.success(f"✅ {len(created)} usuarios creados exitosamente")
+                if conflicts:
+                    st.error(f"❌ Omitidos por usuario o colaborador ya existente: {', '.join(conflicts)}")
+
+def show_users_page():
+    """Muestra la página de gestión de usuarios"""
+    st.markdown('<h1 class="main-header">👤 Gestión de Usuarios</h1>', unsafe_allow_html=True)
+
+    section = section_selector(["📋 Lista de Usuarios", "➕ Nuevo Usuario", "📥 Alta Masiva"], key="users_section")
+
+    if section == "📋 Lista de Usuarios":
+        _list_section()
+    elif section == "➕ Nuevo Usuario":
+        _new_section()
+    elif section == "📥 Alta Masiva":
+        _bulk_section()